@@ -4,12 +4,8 @@ import logging
 from fastapi import APIRouter, HTTPException, status
 
 from app.core.telegram_client import telegram_manager
-from app.core.exceptions import (
-    TelegramNotAuthenticatedError,
-    TwoFactorAuthRequiredError,
-    InvalidPhoneCodeError,
-    InvalidPasswordError
-)
+from app.core.exceptions import TelegramNotAuthenticatedError
+from app.core.response_cache import auth_status_cache, clear_response_caches
 from app.models.requests import (
     RequestCodeRequest,
     VerifyCodeRequest,
@@ -45,7 +41,7 @@ async def request_code(request: RequestCodeRequest):
     try:
         phone_code_hash = await telegram_manager.send_code(request.phone)
 
-        logger.info(f"Verification code sent to {request.phone}")
+        logger.info("Verification code sent to %s", request.phone)
 
         return CodeSentResponse(
             phone_code_hash=phone_code_hash,
@@ -53,19 +49,12 @@ async def request_code(request: RequestCodeRequest):
         )
 
     except TelegramNotAuthenticatedError as e:
-        logger.error(f"Telegram not connected: {e}")
+        logger.error("Telegram not connected: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Telegram client not connected. Please try again later."
         )
 
-    except Exception as e:
-        logger.error(f"Failed to send verification code: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to send verification code: {str(e)}"
-        )
-
 
 @router.post(
     "/verify-code",
@@ -90,38 +79,20 @@ async def verify_code(request: VerifyCodeRequest):
         # Get user info after successful sign in
         me = await telegram_manager.get_me()
 
-        logger.info(f"Successfully authenticated user {me.id}")
+        logger.info("Successfully authenticated user %s", me.id)
 
         return AuthSuccessResponse(
             user_id=me.id,
             message="Authentication successful"
         )
 
-    except TwoFactorAuthRequiredError:
-        logger.info("Two-factor authentication required")
-        return TwoFactorRequiredResponse()
-
-    except InvalidPhoneCodeError:
-        logger.warning("Invalid verification code provided")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid verification code. Please check and try again."
-        )
-
     except TelegramNotAuthenticatedError as e:
-        logger.error(f"Telegram not connected: {e}")
+        logger.error("Telegram not connected: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Telegram client not connected"
         )
 
-    except Exception as e:
-        logger.error(f"Verification failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Verification failed: {str(e)}"
-        )
-
 
 @router.post(
     "/verify-2fa",
@@ -141,34 +112,20 @@ async def verify_2fa(request: Verify2FARequest):
         # Get user info
         me = await telegram_manager.get_me()
 
-        logger.info(f"Successfully authenticated user {me.id} with 2FA")
+        logger.info("Successfully authenticated user %s with 2FA", me.id)
 
         return AuthSuccessResponse(
             user_id=me.id,
             message="Two-factor authentication successful"
         )
 
-    except InvalidPasswordError:
-        logger.warning("Invalid 2FA password provided")
-        raise HTTPException(
-            status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Invalid two-factor authentication password"
-        )
-
     except TelegramNotAuthenticatedError as e:
-        logger.error(f"Telegram not connected: {e}")
+        logger.error("Telegram not connected: %s", e)
         raise HTTPException(
             status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
             detail="Telegram client not connected"
         )
 
-    except Exception as e:
-        logger.error(f"2FA verification failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"2FA verification failed: {str(e)}"
-        )
-
 
 @router.get(
     "/status",
@@ -185,7 +142,7 @@ async def get_auth_status():
     """
     try:
         is_connected = telegram_manager.is_connected()
-        is_authorized = await telegram_manager.is_authorized()
+        is_authorized = await telegram_manager.is_authorized_cached()
 
         if not is_connected:
             return AuthStatusResponse(
@@ -204,17 +161,22 @@ async def get_auth_status():
             )
 
         # Get user info
-        me = await telegram_manager.get_me()
+        me = await telegram_manager.get_me_cached()
+
+        auth_status = auth_status_cache.get(me.id)
+        if auth_status is None:
+            auth_status = AuthStatusResponse(
+                authenticated=True,
+                user_id=me.id,
+                username=me.username,
+                phone=me.phone_number
+            )
+            auth_status_cache[me.id] = auth_status
 
-        return AuthStatusResponse(
-            authenticated=True,
-            user_id=me.id,
-            username=me.username,
-            phone=me.phone_number
-        )
+        return auth_status
 
     except Exception as e:
-        logger.error(f"Failed to get auth status: {e}")
+        logger.error("Failed to get auth status: %s", e)
         return AuthStatusResponse(
             authenticated=False,
             user_id=None,
@@ -237,6 +199,7 @@ async def logout():
     """
     try:
         await telegram_manager.log_out()
+        clear_response_caches()
 
         logger.info("Successfully logged out from Telegram")
 
@@ -249,10 +212,3 @@ async def logout():
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated"
         )
-
-    except Exception as e:
-        logger.error(f"Logout failed: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Logout failed: {str(e)}"
-        )
@@ -1,20 +1,24 @@
 """Channels API routes."""
 
 import logging
-from fastapi import APIRouter, HTTPException, status, Path
+from fastapi import APIRouter, HTTPException, status, Path, Request, Response
+from pydantic import TypeAdapter
 
 from app.core.telegram_client import telegram_manager
-from app.core.exceptions import (
-    TelegramNotAuthenticatedError,
-    ChannelNotFoundError
-)
-from app.services.channel_service import ChannelService
+from app.core.response_cache import joined_channels_cache
+from app.models.requests import ChannelsInfoBatchRequest
 from app.models.responses import ChannelsListResponse, ChannelInfo
+from app.utils.etag import make_etag, etag_matches, not_modified
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Channel info changes rarely, let clients reuse it briefly
+CHANNEL_INFO_CACHE_HEADERS = {"Cache-Control": "max-age=60"}
+
+CHANNEL_INFO_ADAPTER = TypeAdapter(ChannelInfo)
+
 
 @router.get(
     "/joined",
@@ -22,7 +26,7 @@ router = APIRouter()
     summary="Get joined channels",
     description="Get list of channels the authenticated user is subscribed to"
 )
-async def get_joined_channels():
+async def get_joined_channels(request: Request):
     """
     Get list of all channels the authenticated user has joined.
 
@@ -31,38 +35,29 @@ async def get_joined_channels():
 
     Requires authentication.
     """
-    try:
-        # Check authorization
-        is_authorized = await telegram_manager.is_authorized()
-        if not is_authorized:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Not authenticated with Telegram. Please authenticate first."
-            )
-
-        # Get Telegram client
-        client = telegram_manager.get_client()
-
-        # Create service and fetch channels
-        channel_service = ChannelService(client)
-        channels = await channel_service.get_joined_channels()
-
-        logger.info(f"Retrieved {len(channels)} joined channels")
-
-        return ChannelsListResponse(channels=channels)
-
-    except TelegramNotAuthenticatedError:
+    # Check authorization
+    if not await telegram_manager.is_authorized_cached():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated with Telegram"
+            detail="Not authenticated with Telegram. Please authenticate first."
         )
 
-    except Exception as e:
-        logger.error(f"Failed to get joined channels: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to retrieve channels: {str(e)}"
-        )
+    # Serve from the short-lived cache if possible
+    me = await telegram_manager.get_me_cached()
+    cached = joined_channels_cache.get(me.id)
+    if cached is not None:
+        return cached
+
+    # Fetch channels using the shared service
+    channel_service = request.app.state.channel_service
+    async with request.app.state.telegram_semaphore:
+        channels = await channel_service.get_joined_channels()
+
+    logger.info("Retrieved %d joined channels", len(channels))
+
+    response = ChannelsListResponse(channels=channels)
+    joined_channels_cache[me.id] = response
+    return response
 
 
 @router.get(
@@ -72,6 +67,7 @@ async def get_joined_channels():
     description="Get detailed information about a specific channel"
 )
 async def get_channel_info(
+    request: Request,
     channel_id: int = Path(..., description="Channel ID or username")
 ):
     """
@@ -88,41 +84,58 @@ async def get_channel_info(
         - Authentication
         - Access to the channel (must be a member or channel must be public)
     """
-    try:
-        # Check authorization
-        is_authorized = await telegram_manager.is_authorized()
-        if not is_authorized:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Not authenticated with Telegram"
-            )
-
-        # Get Telegram client
-        client = telegram_manager.get_client()
-
-        # Create service and fetch channel info
-        channel_service = ChannelService(client)
+    # Check authorization
+    if not await telegram_manager.is_authorized_cached():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated with Telegram"
+        )
+
+    # Fetch channel info using the shared service
+    channel_service = request.app.state.channel_service
+    async with request.app.state.telegram_semaphore:
         channel_info = await channel_service.get_channel_info(channel_id)
 
-        logger.info(f"Retrieved info for channel {channel_id}")
+    logger.info("Retrieved info for channel %s", channel_id)
 
-        return channel_info
+    # Serialize once; the same bytes feed the ETag and the response body
+    body = CHANNEL_INFO_ADAPTER.dump_json(channel_info)
+    etag = make_etag(body)
+    if etag_matches(request, etag):
+        return not_modified(etag, CHANNEL_INFO_CACHE_HEADERS)
 
-    except ChannelNotFoundError as e:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND,
-            detail=str(e.message)
-        )
+    return Response(
+        content=body,
+        media_type="application/json",
+        headers={**CHANNEL_INFO_CACHE_HEADERS, "ETag": etag}
+    )
+
+
+@router.post(
+    "/info-batch",
+    response_model=ChannelsListResponse,
+    summary="Get information about several channels",
+    description="Get information about up to 100 channels in one request"
+)
+async def get_channels_info_batch(request: Request, body: ChannelsInfoBatchRequest):
+    """
+    Get information about several channels at once.
 
-    except TelegramNotAuthenticatedError:
+    Lookups run concurrently; channels that are not found or not
+    accessible are omitted from the response.
+
+    Requires authentication.
+    """
+    # Check authorization
+    if not await telegram_manager.is_authorized_cached():
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Not authenticated with Telegram"
         )
 
-    except Exception as e:
-        logger.error(f"Failed to get channel info for {channel_id}: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to retrieve channel information: {str(e)}"
-        )
+    # Fetch channel info using the shared service
+    channel_service = request.app.state.channel_service
+    async with request.app.state.telegram_semaphore:
+        channels = await channel_service.get_channels_info(body.channel_ids)
+
+    return ChannelsListResponse(channels=channels)
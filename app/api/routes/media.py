@@ -1,27 +1,65 @@
 """Media API routes."""
 
 import logging
+import mimetypes
+import os
 from typing import Annotated
 from pathlib import Path
+from urllib.parse import quote
 
-from fastapi import APIRouter, HTTPException, status, Path as PathParam
+from fastapi import APIRouter, HTTPException, status, Request, Response, Path as PathParam
 from fastapi.responses import FileResponse
 
 from app.core.telegram_client import telegram_manager
-from app.core.exceptions import (
-    TelegramNotAuthenticatedError,
-    ChannelNotFoundError,
-    MessageNotFoundError,
-    MediaDownloadError
-)
-from app.services.message_service import MessageService
-from app.services.media_service import MediaService
+from app.core.exceptions import ChannelNotFoundError, MessageNotFoundError
+from app.utils.etag import etag_matches, not_modified
 from config import settings
 
 logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Cached media files never change for a given URL
+MEDIA_CACHE_HEADERS = {"Cache-Control": "public, max-age=31536000, immutable"}
+
+
+def _file_response(file_path: Path, etag: str) -> Response:
+    """
+    Build the response for a cached media file.
+
+    By default this is a FileResponse (sent with os.sendfile), reusing a single
+    stat call for size and mtime headers. When MEDIA_ACCEL_REDIRECT_PREFIX is set,
+    an empty response with X-Accel-Redirect is returned so nginx serves the
+    file itself. Type and file name come from the file on disk, never from
+    the requested URL.
+
+    Raises:
+        FileNotFoundError: If the file is no longer on disk
+    """
+    stat_result = os.stat(file_path)
+    file_name = file_path.name
+    media_type = mimetypes.guess_type(file_name)[0] or "application/octet-stream"
+    headers = {**MEDIA_CACHE_HEADERS, "ETag": etag}
+
+    if settings.media_accel_redirect_prefix:
+        relative_path = Path(os.path.relpath(file_path, settings.media_cache_path)).as_posix()
+        headers["X-Accel-Redirect"] = f"{settings.media_accel_redirect_prefix.rstrip('/')}/{quote(relative_path)}"
+        quoted_name = quote(file_name)
+        if quoted_name == file_name:
+            headers["Content-Disposition"] = f'inline; filename="{file_name}"'
+        else:
+            headers["Content-Disposition"] = f"inline; filename*=utf-8''{quoted_name}"
+        return Response(media_type=media_type, headers=headers)
+
+    return FileResponse(
+        file_path,
+        stat_result=stat_result,
+        media_type=media_type,
+        filename=file_name,
+        content_disposition_type="inline",
+        headers=headers
+    )
+
 
 @router.get(
     "/download/{channel_id}/{message_id}/{file_name}",
@@ -29,6 +67,7 @@ router = APIRouter()
     description="Download media file for a specific message. Downloads from Telegram if not cached."
 )
 async def download_media(
+    request: Request,
     channel_id: Annotated[int, PathParam(description="Channel ID")],
     message_id: Annotated[int, PathParam(description="Message ID")],
     file_name: Annotated[str, PathParam(description="File name")]
@@ -39,54 +78,49 @@ async def download_media(
     If the file is already cached, it is served immediately.
     If not, it is downloaded from Telegram first.
     """
-    try:
-        # Check authorization
-        if not await telegram_manager.is_authorized():
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Not authenticated with Telegram"
-            )
-
-        client = telegram_manager.get_client()
-        media_service = MediaService(client)
-        message_service = MessageService(client)
-
-        # Check cache first (optimization to avoid fetching message if file exists)
-        cached_path = media_service.get_cached_media_path(channel_id, message_id, file_name)
-        if cached_path and cached_path.exists():
-            return FileResponse(cached_path)
-
-        # If not cached, we need to fetch the message to download media
+    # Check authorization
+    if not await telegram_manager.is_authorized_cached():
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated with Telegram"
+        )
+
+    # Media for a message never changes, so the ETag is derived from the URL
+    etag = f'"{message_id}-{file_name}"'
+    if etag_matches(request, etag):
+        return not_modified(etag, MEDIA_CACHE_HEADERS)
+
+    media_service = request.app.state.media_service
+    message_service = request.app.state.message_service
+    telegram_semaphore = request.app.state.telegram_semaphore
+
+    # Check cache first (optimization to avoid fetching message if file exists)
+    cached_path = await media_service.find_cached_media(channel_id, message_id, file_name)
+    if cached_path:
         try:
+            return _file_response(cached_path, etag)
+        except FileNotFoundError:
+            # Cached entry is stale (file removed from disk), download again
+            media_service.forget_cached_media(channel_id, message_id, file_name)
+
+    # If not cached, we need to fetch the message to download media
+    try:
+        async with telegram_semaphore:
             message = await message_service.get_message_by_id(channel_id, message_id)
-        except (MessageNotFoundError, ChannelNotFoundError):
-            raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Message or channel not found"
-            )
+    except (MessageNotFoundError, ChannelNotFoundError):
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Message or channel not found"
+        )
 
-        # Download media
-        try:
-            file_path = await media_service.download_media(message, channel_id)
-        except MediaDownloadError:
-            raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail="Failed to download media file"
-            )
-            
-        if not file_path or not file_path.exists():
-             raise HTTPException(
-                status_code=status.HTTP_404_NOT_FOUND,
-                detail="Media file not found"
-            )
-
-        return FileResponse(file_path)
-
-    except HTTPException:
-        raise
-    except Exception as e:
-        logger.error(f"Error serving media file: {e}")
+    # Download media
+    async with telegram_semaphore:
+        file_path = await media_service.download_media(message, channel_id)
+
+    if not file_path or not file_path.exists():
         raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Internal server error: {str(e)}"
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Media file not found"
         )
+
+    return _file_response(file_path, etag)
@@ -1,17 +1,21 @@
 """Messages API routes for microservice."""
 
+import asyncio
 import logging
-from typing import Annotated
-from fastapi import APIRouter, HTTPException, status, Query, Request
+from datetime import datetime
+from typing import Annotated, Literal
+from fastapi import APIRouter, HTTPException, status, Query, Request, Response
+from pydantic import TypeAdapter
+
+try:
+    from ciso8601 import parse_datetime
+except ImportError:
+    def parse_datetime(value: str) -> datetime:
+        """Parse ISO 8601 date string (fallback when ciso8601 is not installed)."""
+        return datetime.fromisoformat(value.replace('Z', '+00:00'))
 
 from app.core.telegram_client import telegram_manager
-from app.core.exceptions import (
-    TelegramNotAuthenticatedError,
-    ChannelNotFoundError,
-    MessageNotFoundError
-)
-from app.services.message_service import MessageService
-from app.services.media_service import MediaService
+from app.core.exceptions import ChannelNotFoundError
 from app.models.responses import MessagesResponse, PaginationInfo
 from config import settings
 
@@ -19,6 +23,9 @@ logger = logging.getLogger(__name__)
 
 router = APIRouter()
 
+# Serializes the whole page in one pydantic-core pass, skipping FastAPI's response re-validation
+MESSAGES_RESPONSE_ADAPTER = TypeAdapter(MessagesResponse)
+
 
 @router.get(
     "",
@@ -46,9 +53,8 @@ async def get_messages(
     include_media: Annotated[bool, Query(
         description="Include media file information"
     )] = True,
-    media_format: Annotated[str, Query(
-        pattern="^(url|base64)$",
-        description="Media format: 'url' or 'base64'"
+    media_format: Annotated[Literal["url", "base64"], Query(
+        description="Media format: 'url' or 'base64' (media over MAX_BASE64_BYTES is always a URL)"
     )] = "url"
 ):
     """
@@ -78,145 +84,152 @@ async def get_messages(
         GET /api/v1/messages?limit=20&date_from=2026-01-01T00:00:00Z
         GET /api/v1/messages?limit=50&offset_id=12345&include_media=false
     """
-    try:
-        # Check authorization
-        is_authorized = await telegram_manager.is_authorized()
-        if not is_authorized:
+    # Validate limit
+    if limit > settings.max_messages_per_request:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"Limit cannot exceed {settings.max_messages_per_request}"
+        )
+
+    # Parse dates if provided
+    date_from_dt = None
+    date_to_dt = None
+
+    if date_from:
+        try:
+            date_from_dt = parse_datetime(date_from)
+        except ValueError as e:
             raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Not authenticated with Telegram. Please authenticate first."
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Invalid date_from format: {str(e)}"
             )
 
-        # Validate limit
-        if limit > settings.max_messages_per_request:
+    if date_to:
+        try:
+            date_to_dt = parse_datetime(date_to)
+        except ValueError as e:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
-                detail=f"Limit cannot exceed {settings.max_messages_per_request}"
+                detail=f"Invalid date_to format: {str(e)}"
             )
 
-        # Parse dates if provided
-        date_from_dt = None
-        date_to_dt = None
-
-        if date_from:
-            try:
-                from datetime import datetime
-                date_from_dt = datetime.fromisoformat(date_from.replace('Z', '+00:00'))
-            except ValueError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid date_from format: {str(e)}"
-                )
+    # Get shared services
+    message_service = request.app.state.message_service
+    media_service = request.app.state.media_service
+    telegram_semaphore = request.app.state.telegram_semaphore
 
-        if date_to:
-            try:
-                from datetime import datetime
-                date_to_dt = datetime.fromisoformat(date_to.replace('Z', '+00:00'))
-            except ValueError as e:
-                raise HTTPException(
-                    status_code=status.HTTP_400_BAD_REQUEST,
-                    detail=f"Invalid date_to format: {str(e)}"
-                )
+    # Use the channel resolved at startup; resolve lazily if that failed
+    target_chat = request.app.state.target_chat
 
-        # Get configured channel ID
+    if target_chat is not None:
+        if not await telegram_manager.is_authorized_cached():
+            raise HTTPException(
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated with Telegram. Please authenticate first."
+            )
+    else:
         target_channel_id = settings.target_channel_id
 
-        # Get Telegram client
-        client = telegram_manager.get_client()
+        # Check authorization and resolve channel ID to int and title concurrently
+        async with telegram_semaphore:
+            is_authorized, chat = await asyncio.gather(
+                telegram_manager.is_authorized_cached(),
+                message_service.resolve_chat(target_channel_id),
+                return_exceptions=True
+            )
 
-        # Resolve channel ID to int and get title
-        try:
-            chat = await client.get_chat(target_channel_id)
-            channel_id = chat.id
-            channel_title = chat.title or str(channel_id)
-        except Exception as e:
-            from pyrogram.errors import ChannelPrivate, UsernameNotOccupied
-            if isinstance(e, (ChannelPrivate, UsernameNotOccupied)):
-                raise ChannelNotFoundError(target_channel_id)
-            logger.error(f"Failed to resolve channel {target_channel_id}: {e}")
+        if is_authorized is not True:
             raise HTTPException(
-                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-                detail=f"Failed to resolve channel: {str(e)}"
+                status_code=status.HTTP_401_UNAUTHORIZED,
+                detail="Not authenticated with Telegram. Please authenticate first."
             )
 
-        # Create services
-        message_service = MessageService(client)
-        media_service = MediaService(client)
-
-        # Fetch messages
-        logger.info(
-            f"Fetching messages from configured channel {channel_id} "
-            f"(limit={limit}, offset_id={offset_id})"
-        )
-
-        messages, next_offset_id, has_more = await message_service.fetch_messages(
-            channel_id=channel_id,
-            limit=limit,
-            offset_id=offset_id,
-            date_from=date_from_dt,
-            date_to=date_to_dt
-        )
-
-        # Format messages with media handling
-        async def media_url_generator(message):
-            """Generate media URL for a message."""
-            if not include_media:
-                return None
-
-            # Get base URL from request
-            base_url = str(request.base_url).rstrip('/')
-
-            if media_format == "base64":
-                # Return base64 encoded media
-                return await media_service.get_media_base64(message, channel_id)
-            else:
-                # Return URL to media
-                # Use lazy URL generation to avoid blocking download
-                return media_service.get_lazy_media_url(
-                    message,
-                    channel_id,
-                    base_url
-                )
+        if isinstance(chat, ChannelNotFoundError):
+            raise HTTPException(
+                status_code=status.HTTP_404_NOT_FOUND,
+                detail=f"Configured channel not accessible: {chat.message}"
+            )
 
-        formatted_messages = await message_service.format_messages(
-            messages,
-            include_media=include_media,
-            media_url_generator=media_url_generator if include_media else None
-        )
+        if isinstance(chat, Exception):
+            logger.error("Failed to resolve channel %s: %s", target_channel_id, chat)
+            raise chat
 
-        # Build pagination info
-        pagination = PaginationInfo(
-            total_fetched=len(formatted_messages),
-            next_offset_id=next_offset_id,
-            has_more=has_more
-        )
+        target_chat = {"id": chat.id, "title": chat.title or str(chat.id)}
+        request.app.state.target_chat = target_chat
 
-        logger.info(
-            f"Retrieved {len(formatted_messages)} messages from channel {channel_id}"
-        )
+    channel_id = target_chat["id"]
+    channel_title = target_chat["title"]
 
-        return MessagesResponse(
-            channel_id=channel_id,
-            channel_title=channel_title,
-            messages=formatted_messages,
-            pagination=pagination
-        )
+    # Fetch messages
+    logger.info(
+        "Fetching messages from configured channel %s (limit=%d, offset_id=%d)",
+        channel_id, limit, offset_id
+    )
 
+    try:
+        async with telegram_semaphore:
+            messages, next_offset_id, has_more = await message_service.fetch_messages(
+                channel_id=channel_id,
+                limit=limit,
+                offset_id=offset_id,
+                date_from=date_from_dt,
+                date_to=date_to_dt
+            )
     except ChannelNotFoundError as e:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND,
-            detail=f"Configured channel not accessible: {str(e.message)}"
+            detail=f"Configured channel not accessible: {e.message}"
         )
 
-    except TelegramNotAuthenticatedError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Not authenticated with Telegram"
-        )
+    # Format messages with media handling (skipped entirely without media)
+    media_url_generator = None
+
+    if include_media:
+        # Get base URL from request once for all messages
+        base_url = str(request.base_url).rstrip('/')
+
+        if media_format == "base64":
+            async def media_url_generator(message):
+                """Return base64 encoded media for a message, or a URL if it is too large."""
+                if media_service.is_too_large_for_base64(message):
+                    return media_service.get_lazy_media_url(message, channel_id, base_url)
+                async with telegram_semaphore:
+                    return await media_service.get_media_base64(message, channel_id)
+        else:
+            def media_url_generator(message):
+                """Return URL to media, using lazy URL generation to avoid blocking download."""
+                return media_service.get_lazy_media_url(
+                    message,
+                    channel_id,
+                    base_url
+                )
+
+    formatted_messages = await message_service.format_messages(
+        messages,
+        include_media=include_media,
+        media_url_generator=media_url_generator
+    )
+
+    # Build pagination info
+    pagination = PaginationInfo(
+        total_fetched=len(formatted_messages),
+        next_offset_id=next_offset_id,
+        has_more=has_more
+    )
+
+    logger.info(
+        "Retrieved %d messages from channel %s",
+        len(formatted_messages), channel_id
+    )
+
+    response = MessagesResponse(
+        channel_id=channel_id,
+        channel_title=channel_title,
+        messages=formatted_messages,
+        pagination=pagination
+    )
+    return Response(
+        content=MESSAGES_RESPONSE_ADAPTER.dump_json(response),
+        media_type="application/json"
+    )
 
-    except Exception as e:
-        logger.error(f"Failed to fetch messages from configured channel: {e}")
-        raise HTTPException(
-            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"Failed to fetch messages: {str(e)}"
-        )
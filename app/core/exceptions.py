@@ -4,8 +4,16 @@
 class TelegramBaseException(Exception):
     """Base exception for all Telegram-related errors."""
     def __init__(self, message: str = "Telegram error occurred"):
-        self.message = message
-        super().__init__(self.message)
+        self._message = message
+        super().__init__(message)
+
+    @property
+    def message(self) -> str:
+        """Human-readable error message."""
+        return self._message
+
+    def __str__(self) -> str:
+        return self.message
 
 
 class TelegramNotAuthenticatedError(TelegramBaseException):
@@ -23,26 +31,34 @@ class TelegramConnectionError(TelegramBaseException):
 class ChannelNotFoundError(TelegramBaseException):
     """Raised when requested channel is not found or not accessible."""
     def __init__(self, channel_id: int | str = None, message: str = None):
-        if message is None:
-            if channel_id:
-                message = f"Channel {channel_id} not found or not accessible"
-            else:
-                message = "Channel not found or not accessible"
         super().__init__(message)
         self.channel_id = channel_id
 
+    @property
+    def message(self) -> str:
+        """Error message, built only when the error is rendered."""
+        if self._message is not None:
+            return self._message
+        if self.channel_id:
+            return f"Channel {self.channel_id} not found or not accessible"
+        return "Channel not found or not accessible"
+
 
 class MessageNotFoundError(TelegramBaseException):
     """Raised when requested message is not found."""
     def __init__(self, message_id: int = None, message: str = None):
-        if message is None:
-            if message_id:
-                message = f"Message {message_id} not found"
-            else:
-                message = "Message not found"
         super().__init__(message)
         self.message_id = message_id
 
+    @property
+    def message(self) -> str:
+        """Error message, built only when the error is rendered."""
+        if self._message is not None:
+            return self._message
+        if self.message_id:
+            return f"Message {self.message_id} not found"
+        return "Message not found"
+
 
 class MediaDownloadError(TelegramBaseException):
     """Raised when media file download fails."""
@@ -72,3 +88,9 @@ class InvalidPasswordError(TelegramBaseException):
     """Raised when provided 2FA password is invalid."""
     def __init__(self, message: str = "Invalid 2FA password"):
         super().__init__(message)
+
+
+class AuthInProgressError(TelegramBaseException):
+    """Raised when another authentication attempt is already running."""
+    def __init__(self, message: str = "Another authentication attempt is in progress"):
+        super().__init__(message)
@@ -0,0 +1,96 @@
+"""Adaptive token-bucket rate limiting for outbound Telegram calls."""
+
+import asyncio
+import logging
+import time
+from typing import Awaitable, Callable, TypeVar
+
+from pyrogram.errors import FloodWait
+
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+# Longest FloodWait (seconds) slept through before the error is raised to the caller
+MAX_FLOOD_WAIT_SLEEP = 30
+
+
+class TokenBucket:
+    """
+    Token bucket whose refill rate adapts to Telegram's responses.
+
+    Each success raises the rate additively (up to max_rate); a FloodWait
+    halves it (down to min_rate), so throughput settles at the actual quota.
+    """
+
+    def __init__(
+        self,
+        rate: float,
+        capacity: float,
+        min_rate: float = 0.5,
+        max_rate: float | None = None,
+        increase: float = 0.1,
+        decrease: float = 0.5
+    ):
+        self.rate = rate
+        self.capacity = capacity
+        self.min_rate = min_rate
+        self.max_rate = max_rate if max_rate is not None else rate * 4
+        self.increase = increase
+        self.decrease = decrease
+        self._tokens = capacity
+        self._updated_at = time.monotonic()
+        self._lock = asyncio.Lock()
+
+    def _refill(self) -> None:
+        """Add tokens accrued since the last update."""
+        now = time.monotonic()
+        self._tokens = min(self.capacity, self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+    async def acquire(self) -> None:
+        """Wait until a token is available and take it."""
+        async with self._lock:
+            self._refill()
+            if self._tokens < 1:
+                await asyncio.sleep((1 - self._tokens) / self.rate)
+                self._refill()
+            self._tokens -= 1
+
+    def on_success(self) -> None:
+        """Additively raise the rate after a successful call."""
+        self.rate = min(self.max_rate, self.rate + self.increase)
+
+    def on_flood_wait(self) -> None:
+        """Multiplicatively cut the rate and drain the bucket after a FloodWait."""
+        self.rate = max(self.min_rate, self.rate * self.decrease)
+        self._tokens = 0
+
+
+async def call_limited(bucket: TokenBucket, coro_factory: Callable[[], Awaitable[T]]) -> T:
+    """
+    Run a Telegram call through a token bucket, honoring FloodWait.
+
+    Args:
+        bucket: Bucket for the called method
+        coro_factory: Callable returning a fresh awaitable for each attempt
+
+    Returns:
+        Result of the call
+
+    Raises:
+        FloodWait: If Telegram asks to wait longer than MAX_FLOOD_WAIT_SLEEP
+    """
+    while True:
+        await bucket.acquire()
+        try:
+            result = await coro_factory()
+        except FloodWait as e:
+            bucket.on_flood_wait()
+            if e.value > MAX_FLOOD_WAIT_SLEEP:
+                raise
+            logger.warning("Flood wait of %ss, retrying (rate now %.2f/s)", e.value, bucket.rate)
+            await asyncio.sleep(e.value)
+            continue
+        bucket.on_success()
+        return result
@@ -0,0 +1,15 @@
+"""Short-lived in-process caches for responses that rarely change."""
+
+from cachetools import TTLCache
+
+from config import settings
+
+# Keyed by the authenticated user's ID
+joined_channels_cache: TTLCache = TTLCache(maxsize=1024, ttl=settings.response_cache_ttl)
+auth_status_cache: TTLCache = TTLCache(maxsize=1024, ttl=settings.response_cache_ttl)
+
+
+def clear_response_caches() -> None:
+    """Drop all cached responses (e.g. after logout)."""
+    joined_channels_cache.clear()
+    auth_status_cache.clear()
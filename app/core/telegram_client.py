@@ -1,19 +1,25 @@
 """Telegram client manager for Pyrogram."""
 
+import asyncio
 import logging
+import time
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Optional
+from typing import Any, AsyncIterator, Awaitable, Callable, Optional, TypeVar
 
 from pyrogram import Client
 from pyrogram.errors import (
     SessionPasswordNeeded,
     PhoneCodeInvalid,
     PasswordHashInvalid,
-    FloodWait
+    FloodWait,
+    Unauthorized
 )
 
 from config import settings
+from app.core.ratelimit import TokenBucket, call_limited
 from app.core.exceptions import (
+    AuthInProgressError,
     TelegramNotAuthenticatedError,
     TelegramConnectionError,
     TwoFactorAuthRequiredError,
@@ -23,33 +29,84 @@ from app.core.exceptions import (
 
 logger = logging.getLogger(__name__)
 
+T = TypeVar("T")
 
-class TelegramClientManager:
+# Seconds an auth call waits for a running auth attempt before failing with 429
+AUTH_LOCK_TIMEOUT = 0.1
+
+# PRAGMAs applied to the sqlite session file after connecting (fewer fsyncs per peer/state write)
+SESSION_PRAGMAS = (
+    "PRAGMA journal_mode=MEMORY",
+    "PRAGMA synchronous=NORMAL",
+)
+
+# Initial (rate per second, burst capacity) of the token bucket for each Telegram method
+RATE_LIMITS = {
+    "get_me": (4.0, 20),
+    "get_chat": (4.0, 20),
+    "send_code": (0.5, 3),
+    "sign_in": (0.5, 3),
+    "check_password": (0.5, 3),
+    "log_out": (0.5, 3),
+    "get_messages": (4.0, 20),
+    "get_chat_history": (2.0, 10),
+    "download_media": (2.0, 10),
+}
+
+
+class AuthCache:
     """
-    Singleton manager for Pyrogram Client.
-    Handles connection lifecycle and authentication state.
+    Short-lived in-memory cache for the authorization state.
+    Stores the current user object so repeated checks skip the Telegram round-trip.
     """
 
-    _instance: Optional['TelegramClientManager'] = None
-    _client: Optional[Client] = None
-    _initialized: bool = False
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self.authorized: bool = False
+        self.me: Any = None
+        self.expires_at: float = 0.0
+
+    def is_fresh(self) -> bool:
+        """Check if the cached state has not expired yet."""
+        return time.monotonic() < self.expires_at
+
+    def set(self, me: Any) -> None:
+        """Store the current user (or None if not authorized)."""
+        self.me = me
+        self.authorized = me is not None
+        self.expires_at = time.monotonic() + self.ttl
+
+    def invalidate(self) -> None:
+        """Drop the cached state so the next check hits Telegram."""
+        self.me = None
+        self.authorized = False
+        self.expires_at = 0.0
+
 
-    def __new__(cls):
-        """Ensure only one instance exists (Singleton pattern)."""
-        if cls._instance is None:
-            cls._instance = super().__new__(cls)
-        return cls._instance
+class _TelegramClientManager:
+    """
+    Manager for the Pyrogram Client.
+    Handles connection lifecycle and authentication state.
+    Use the module-level telegram_manager instance.
+    """
 
     def __init__(self):
         """Initialize the Telegram client manager."""
-        if self._initialized:
-            return
+        self._client: Optional[Client] = None
 
         # Ensure sessions directory exists
         sessions_path = Path(settings.sessions_dir)
         sessions_path.mkdir(parents=True, exist_ok=True)
 
-        self._initialized = True
+        self._auth_cache = AuthCache(settings.auth_cache_ttl)
+        self._reconnect_callbacks: list[Callable[[Client], None]] = []
+        self._auth_lock = asyncio.Lock()
+        self._me_lock = asyncio.Lock()
+        self._rate_limits = {
+            method: TokenBucket(rate=rate, capacity=capacity)
+            for method, (rate, capacity) in RATE_LIMITS.items()
+        }
+
         logger.info("TelegramClientManager initialized")
 
     async def start(self) -> None:
@@ -69,14 +126,17 @@ class TelegramClientManager:
                 api_id=settings.telegram_api_id,
                 api_hash=settings.telegram_api_hash,
                 workdir=settings.sessions_dir,
+                workers=settings.telegram_workers,
+                max_concurrent_transmissions=settings.telegram_max_concurrent_transmissions,
             )
+            self._notify_reconnect()
 
             # Check if session file exists
             session_file = Path(settings.sessions_dir) / f"{settings.session_name}.session"
 
             if session_file.exists():
                 # Session exists - connect without interactive prompts
-                await self._client.connect()
+                await self._connect()
                 logger.info("Telegram client connected with existing session")
             else:
                 # No session - just initialize the client object
@@ -84,18 +144,48 @@ class TelegramClientManager:
                 logger.info("Telegram client initialized (no session found, authentication required)")
 
         except Exception as e:
-            logger.error(f"Failed to initialize Telegram client: {e}")
+            logger.error("Failed to initialize Telegram client: %s", e)
             # Don't raise exception - allow app to start without Telegram connection
             logger.warning("Application will start without Telegram connection")
 
+    async def _connect(self) -> None:
+        """Connect the client and tune its sqlite session storage."""
+        await self._client.connect()
+        conn = getattr(self._client.storage, "conn", None)
+        if conn is None:
+            return
+        try:
+            for pragma in SESSION_PRAGMAS:
+                conn.execute(pragma)
+        except Exception as e:
+            logger.warning("Failed to tune session storage: %s", e)
+
+    def on_reconnect(self, callback: Callable[[Client], None]) -> None:
+        """
+        Register a callback invoked with the new client whenever it is (re)created.
+        Called immediately if a client already exists.
+        """
+        self._reconnect_callbacks.append(callback)
+        if self._client is not None:
+            callback(self._client)
+
+    def _notify_reconnect(self) -> None:
+        """Invoke registered reconnect callbacks with the current client."""
+        for callback in self._reconnect_callbacks:
+            try:
+                callback(self._client)
+            except Exception as e:
+                logger.error("Reconnect callback failed: %s", e)
+
     async def stop(self) -> None:
         """Stop the Pyrogram client."""
+        self._auth_cache.invalidate()
         if self._client and self._client.is_connected:
             try:
                 await self._client.stop()
                 logger.info("Telegram client stopped")
             except Exception as e:
-                logger.error(f"Error stopping Telegram client: {e}")
+                logger.error("Error stopping Telegram client: %s", e)
         else:
             logger.info("Telegram client not connected, nothing to stop")
 
@@ -107,17 +197,59 @@ class TelegramClientManager:
         """
         Check if the client is authorized (logged in).
         Returns True if session is valid and user is authenticated.
+        The result is shared for auth_cache_ttl seconds (see is_authorized_cached).
+        """
+        return await self.is_authorized_cached()
+
+    async def is_authorized_cached(self) -> bool:
+        """
+        Check if the client is authorized, reusing the result for auth_cache_ttl seconds.
+        Concurrent callers with a stale cache share a single get_me round-trip.
         """
         if not self.is_connected():
             return False
 
-        try:
-            # Try to get current user info to verify authentication
-            me = await self._client.get_me()
-            return me is not None
-        except Exception as e:
-            logger.debug(f"Authorization check failed: {e}")
-            return False
+        if not self._auth_cache.is_fresh():
+            async with self._me_lock:
+                # Another caller may have refreshed the cache while we waited
+                if not self._auth_cache.is_fresh():
+                    try:
+                        me = await self.call("get_me", self._client.get_me)
+                    except Unauthorized as e:
+                        # Definite answer: the session is not (or no longer) authorized
+                        logger.debug("Authorization check failed: %s", e)
+                        me = None
+                    except Exception as e:
+                        # Timeouts, FloodWait, network errors: don't cache, retry next time
+                        logger.warning("Authorization check errored: %s", e)
+                        return False
+                    self._auth_cache.set(me)
+
+        return self._auth_cache.authorized
+
+    async def call(self, method: str, coro_factory: Callable[[], Awaitable[T]]) -> T:
+        """
+        Run a Telegram call through the rate limiter for that method.
+
+        Args:
+            method: Telegram method name (key of RATE_LIMITS)
+            coro_factory: Callable returning a fresh awaitable for each attempt
+
+        Returns:
+            Result of the call
+        """
+        return await call_limited(self._rate_limits[method], coro_factory)
+
+    async def acquire(self, method: str) -> None:
+        """
+        Take a token from the rate limiter for that method without making the call.
+
+        Used for calls that cannot be retried as a whole, such as async generators.
+
+        Args:
+            method: Telegram method name (key of RATE_LIMITS)
+        """
+        await self._rate_limits[method].acquire()
 
     def get_client(self) -> Client:
         """
@@ -130,68 +262,90 @@ class TelegramClientManager:
             )
         return self._client
 
+    @asynccontextmanager
+    async def _auth_attempt(self) -> AsyncIterator[None]:
+        """
+        Allow only one auth call (send_code, sign_in, check_password) at a time.
+
+        Raises:
+            AuthInProgressError: If another attempt holds the lock for longer than AUTH_LOCK_TIMEOUT
+        """
+        try:
+            await asyncio.wait_for(self._auth_lock.acquire(), timeout=AUTH_LOCK_TIMEOUT)
+        except asyncio.TimeoutError:
+            raise AuthInProgressError()
+        try:
+            yield
+        finally:
+            self._auth_lock.release()
+
     async def send_code(self, phone: str) -> str:
         """
         Send verification code to the phone number.
         Returns phone_code_hash for verification.
         """
-        try:
-            # Ensure client is initialized
-            if not self._client:
-                await self.start()
+        async with self._auth_attempt():
+            try:
+                # Ensure client is initialized
+                if not self._client:
+                    await self.start()
 
-            # Connect if not connected
-            if not self._client.is_connected:
-                await self._client.connect()
+                # Connect if not connected
+                if not self._client.is_connected:
+                    await self._connect()
 
-            sent_code = await self._client.send_code(phone)
-            logger.info(f"Verification code sent to {phone}")
-            return sent_code.phone_code_hash
-        except Exception as e:
-            logger.error(f"Failed to send verification code: {e}")
-            raise
+                sent_code = await self.call("send_code", lambda: self._client.send_code(phone))
+                logger.info("Verification code sent to %s", phone)
+                return sent_code.phone_code_hash
+            except Exception as e:
+                logger.error("Failed to send verification code: %s", e)
+                raise
 
     async def sign_in(self, phone: str, code: str, phone_code_hash: str) -> bool:
         """
         Sign in with phone number and verification code.
         Returns True on success, raises exception on failure.
         """
-        try:
-            client = self.get_client()
-            await client.sign_in(phone, phone_code_hash, code)
-            logger.info(f"Successfully signed in with phone {phone}")
-            return True
+        async with self._auth_attempt():
+            try:
+                client = self.get_client()
+                await self.call("sign_in", lambda: client.sign_in(phone, phone_code_hash, code))
+                self._auth_cache.invalidate()
+                logger.info("Successfully signed in with phone %s", phone)
+                return True
 
-        except SessionPasswordNeeded:
-            logger.info("Two-factor authentication is enabled")
-            raise TwoFactorAuthRequiredError()
+            except SessionPasswordNeeded:
+                logger.info("Two-factor authentication is enabled")
+                raise TwoFactorAuthRequiredError()
 
-        except PhoneCodeInvalid:
-            logger.error("Invalid phone verification code")
-            raise InvalidPhoneCodeError()
+            except PhoneCodeInvalid:
+                logger.error("Invalid phone verification code")
+                raise InvalidPhoneCodeError()
 
-        except Exception as e:
-            logger.error(f"Sign in failed: {e}")
-            raise
+            except Exception as e:
+                logger.error("Sign in failed: %s", e)
+                raise
 
     async def check_password(self, password: str) -> bool:
         """
         Complete 2FA authentication with password.
         Returns True on success, raises exception on failure.
         """
-        try:
-            client = self.get_client()
-            await client.check_password(password)
-            logger.info("Successfully authenticated with 2FA password")
-            return True
+        async with self._auth_attempt():
+            try:
+                client = self.get_client()
+                await self.call("check_password", lambda: client.check_password(password))
+                self._auth_cache.invalidate()
+                logger.info("Successfully authenticated with 2FA password")
+                return True
 
-        except PasswordHashInvalid:
-            logger.error("Invalid 2FA password")
-            raise InvalidPasswordError()
+            except PasswordHashInvalid:
+                logger.error("Invalid 2FA password")
+                raise InvalidPasswordError()
 
-        except Exception as e:
-            logger.error(f"2FA authentication failed: {e}")
-            raise
+            except Exception as e:
+                logger.error("2FA authentication failed: %s", e)
+                raise
 
     async def log_out(self) -> bool:
         """
@@ -200,18 +354,27 @@ class TelegramClientManager:
         """
         try:
             client = self.get_client()
-            await client.log_out()
+            await self.call("log_out", client.log_out)
+            self._auth_cache.invalidate()
             logger.info("Successfully logged out from Telegram")
             return True
         except Exception as e:
-            logger.error(f"Logout failed: {e}")
+            logger.error("Logout failed: %s", e)
             raise
 
     async def get_me(self):
         """Get information about the current user."""
         client = self.get_client()
-        return await client.get_me()
+        me = await self.call("get_me", client.get_me)
+        self._auth_cache.set(me)
+        return me
+
+    async def get_me_cached(self):
+        """Get information about the current user, cached for auth_cache_ttl seconds."""
+        if await self.is_authorized_cached():
+            return self._auth_cache.me
+        return await self.get_me()
 
 
-# Global singleton instance
-telegram_manager = TelegramClientManager()
+# The single shared manager instance
+telegram_manager = _TelegramClientManager()
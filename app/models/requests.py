@@ -1,9 +1,40 @@
 """Pydantic models for API requests."""
 
+import re
 from datetime import datetime
-from typing import Optional
+from typing import List, Literal, Optional
 from pydantic import BaseModel, Field, field_validator
 
+from config import settings
+
+# Read once at import so limit validation is a plain bound check in pydantic-core
+_MAX_MESSAGES = settings.max_messages_per_request
+
+# Characters dropped from phone numbers and codes before validation
+_PHONE_STRIP = str.maketrans('', '', ' -')
+_CODE_STRIP = str.maketrans('', '', ' ')
+
+_PHONE_RE = re.compile(r'\+\d+')
+_CODE_RE = re.compile(r'\d+')
+
+
+def _validate_phone(v: str) -> str:
+    """Normalize a phone number and check it is + followed by digits."""
+    phone = v.translate(_PHONE_STRIP)
+    if _PHONE_RE.fullmatch(phone):
+        return phone
+    if not phone.startswith('+'):
+        raise ValueError('Phone number must start with + (international format)')
+    raise ValueError('Phone number must contain only digits after +')
+
+
+def _validate_code(v: str) -> str:
+    """Normalize a verification code and check it is digits only."""
+    code = v.translate(_CODE_STRIP)
+    if not _CODE_RE.fullmatch(code):
+        raise ValueError('Verification code must contain only digits')
+    return code
+
 
 class RequestCodeRequest(BaseModel):
     """Request model for requesting verification code."""
@@ -13,18 +44,7 @@ class RequestCodeRequest(BaseModel):
     @classmethod
     def validate_phone(cls, v: str) -> str:
         """Validate phone number format."""
-        # Remove spaces and dashes
-        phone = v.replace(' ', '').replace('-', '')
-
-        # Must start with +
-        if not phone.startswith('+'):
-            raise ValueError('Phone number must start with + (international format)')
-
-        # Must contain only digits after +
-        if not phone[1:].isdigit():
-            raise ValueError('Phone number must contain only digits after +')
-
-        return phone
+        return _validate_phone(v)
 
 
 class VerifyCodeRequest(BaseModel):
@@ -37,25 +57,13 @@ class VerifyCodeRequest(BaseModel):
     @classmethod
     def validate_phone(cls, v: str) -> str:
         """Validate phone number format."""
-        phone = v.replace(' ', '').replace('-', '')
-        if not phone.startswith('+'):
-            raise ValueError('Phone number must start with + (international format)')
-        if not phone[1:].isdigit():
-            raise ValueError('Phone number must contain only digits after +')
-        return phone
+        return _validate_phone(v)
 
     @field_validator('code')
     @classmethod
     def validate_code(cls, v: str) -> str:
         """Validate verification code."""
-        # Remove spaces
-        code = v.replace(' ', '')
-
-        # Must be digits only
-        if not code.isdigit():
-            raise ValueError('Verification code must contain only digits')
-
-        return code
+        return _validate_code(v)
 
 
 class Verify2FARequest(BaseModel):
@@ -67,12 +75,17 @@ class Verify2FARequest(BaseModel):
     @classmethod
     def validate_phone(cls, v: str) -> str:
         """Validate phone number format."""
-        phone = v.replace(' ', '').replace('-', '')
-        if not phone.startswith('+'):
-            raise ValueError('Phone number must start with + (international format)')
-        if not phone[1:].isdigit():
-            raise ValueError('Phone number must contain only digits after +')
-        return phone
+        return _validate_phone(v)
+
+
+class ChannelsInfoBatchRequest(BaseModel):
+    """Request model for fetching information about several channels."""
+    channel_ids: List[int] = Field(
+        ...,
+        description="Channel IDs to look up",
+        min_length=1,
+        max_length=100
+    )
 
 
 class GetMessagesQuery(BaseModel):
@@ -81,7 +94,7 @@ class GetMessagesQuery(BaseModel):
         default=20,
         description="Number of messages to retrieve",
         ge=1,
-        le=100
+        le=_MAX_MESSAGES
     )
     offset_id: int = Field(
         default=0,
@@ -100,19 +113,7 @@ class GetMessagesQuery(BaseModel):
         default=True,
         description="Whether to include media information"
     )
-    media_format: str = Field(
+    media_format: Literal["url", "base64"] = Field(
         default="url",
-        description="Media format: 'url' or 'base64'",
-        pattern="^(url|base64)$"
+        description="Media format: 'url' or 'base64'"
     )
-
-    @field_validator('limit')
-    @classmethod
-    def validate_limit(cls, v: int) -> int:
-        """Validate limit is within acceptable range."""
-        from config import settings
-        if v > settings.max_messages_per_request:
-            raise ValueError(
-                f'Limit cannot exceed {settings.max_messages_per_request}'
-            )
-        return v
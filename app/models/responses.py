@@ -2,17 +2,24 @@
 
 from datetime import datetime
 from typing import Optional, List
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
+
+# Message models are built once per page and serialized right away, never mutated
+FROZEN_CONFIG = ConfigDict(frozen=True, extra='ignore')
 
 
 class ReactionInfo(BaseModel):
     """Information about a message reaction."""
+    model_config = FROZEN_CONFIG
+
     emoji: str = Field(..., description="Reaction emoji")
     count: int = Field(..., description="Number of reactions")
 
 
 class AuthorInfo(BaseModel):
     """Information about message author."""
+    model_config = FROZEN_CONFIG
+
     id: Optional[int] = Field(None, description="User ID")
     username: Optional[str] = Field(None, description="Username")
     first_name: Optional[str] = Field(None, description="First name")
@@ -21,6 +28,8 @@ class AuthorInfo(BaseModel):
 
 class MediaInfo(BaseModel):
     """Information about media file in a message."""
+    model_config = FROZEN_CONFIG
+
     type: str = Field(..., description="Media type (photo, video, document, etc.)")
     url: Optional[str] = Field(None, description="URL to download the media")
     thumbnail_url: Optional[str] = Field(None, description="URL to thumbnail")
@@ -34,6 +43,8 @@ class MediaInfo(BaseModel):
 
 class MessageResponse(BaseModel):
     """Response model for a single message."""
+    model_config = FROZEN_CONFIG
+
     id: int = Field(..., description="Message ID")
     text: Optional[str] = Field(None, description="Message text content")
     date: datetime = Field(..., description="Message date and time")
@@ -49,6 +60,8 @@ class MessageResponse(BaseModel):
 
 class PaginationInfo(BaseModel):
     """Pagination information for message list."""
+    model_config = FROZEN_CONFIG
+
     total_fetched: int = Field(..., description="Number of messages in current response")
     next_offset_id: Optional[int] = Field(None, description="Offset ID for next page")
     has_more: bool = Field(..., description="Whether more messages are available")
@@ -56,6 +69,8 @@ class PaginationInfo(BaseModel):
 
 class MessagesResponse(BaseModel):
     """Response model for messages list."""
+    model_config = FROZEN_CONFIG
+
     channel_id: int = Field(..., description="Channel ID")
     channel_title: str = Field(..., description="Channel title")
     messages: List[MessageResponse] = Field(..., description="List of messages")
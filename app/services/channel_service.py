@@ -1,16 +1,22 @@
 """Service for channel-related operations."""
 
+import asyncio
 import logging
 from typing import List
 from pyrogram import Client
-from pyrogram.errors import ChannelPrivate, UsernameNotOccupied, UsernameInvalid
+from pyrogram.enums import ChatType
+from pyrogram.errors import ChannelPrivate, ChannelInvalid, PeerIdInvalid, UsernameNotOccupied, UsernameInvalid
 
+from app.core.telegram_client import telegram_manager
 from app.core.exceptions import ChannelNotFoundError
 from app.models.responses import ChannelInfo
 from app.utils.formatters import format_channel
 
 logger = logging.getLogger(__name__)
 
+# Chat types listed by get_joined_channels
+_CHANNEL_TYPES = frozenset({ChatType.CHANNEL, ChatType.SUPERGROUP})
+
 
 class ChannelService:
     """Service for managing Telegram channel operations."""
@@ -35,20 +41,20 @@ class ChannelService:
             TelegramNotAuthenticatedError: If not authenticated
         """
         try:
-            channels = []
-
-            # Get all dialogs (chats)
-            async for dialog in self.client.get_dialogs():
-                # Filter only channels (not groups or private chats)
-                if dialog.chat.type.name in ["CHANNEL", "SUPERGROUP"]:
-                    channel_info = format_channel(dialog.chat)
-                    channels.append(channel_info)
-
-            logger.info(f"Retrieved {len(channels)} joined channels")
+            # Collect channel chats from all dialogs first (not groups or private chats),
+            # then format them in one pass; format_channel does no I/O
+            chats = [
+                dialog.chat
+                async for dialog in self.client.get_dialogs()
+                if dialog.chat.type in _CHANNEL_TYPES
+            ]
+            channels = [format_channel(chat) for chat in chats]
+
+            logger.info("Retrieved %s joined channels", len(channels))
             return channels
 
         except Exception as e:
-            logger.error(f"Failed to get joined channels: {e}")
+            logger.error("Failed to get joined channels: %s", e)
             raise
 
     async def get_channel_info(self, channel_id: int | str) -> ChannelInfo:
@@ -65,18 +71,47 @@ class ChannelService:
             ChannelNotFoundError: If channel not found or not accessible
         """
         try:
-            chat = await self.client.get_chat(channel_id)
-            logger.info(f"Retrieved info for channel: {channel_id}")
+            chat = await telegram_manager.call("get_chat", lambda: self.client.get_chat(channel_id))
+            logger.info("Retrieved info for channel: %s", channel_id)
             return format_channel(chat)
 
         except (ChannelPrivate, UsernameNotOccupied, UsernameInvalid) as e:
-            logger.error(f"Channel {channel_id} not found or not accessible: {e}")
+            logger.error("Channel %s not found or not accessible: %s", channel_id, e)
             raise ChannelNotFoundError(channel_id)
 
         except Exception as e:
-            logger.error(f"Failed to get channel info for {channel_id}: {e}")
+            logger.error("Failed to get channel info for %s: %s", channel_id, e)
             raise
 
+    async def get_channels_info(self, channel_ids: List[int | str]) -> List[ChannelInfo]:
+        """
+        Get information about several channels concurrently.
+
+        Channels that are not found or not accessible are skipped.
+
+        Args:
+            channel_ids: List of channel IDs (int) or usernames (str)
+
+        Returns:
+            List of ChannelInfo objects in request order
+        """
+        results = await asyncio.gather(
+            *(self.get_channel_info(channel_id) for channel_id in channel_ids),
+            return_exceptions=True
+        )
+
+        channels = []
+        for channel_id, result in zip(channel_ids, results):
+            # Unknown peers surface as PeerIdInvalid/ChannelInvalid or KeyError from the peer cache
+            if isinstance(result, (ChannelNotFoundError, PeerIdInvalid, ChannelInvalid, KeyError)):
+                continue
+            if isinstance(result, Exception):
+                raise result
+            channels.append(result)
+
+        logger.info("Retrieved info for %s of %s channels", len(channels), len(channel_ids))
+        return channels
+
     async def is_channel_accessible(self, channel_id: int | str) -> bool:
         """
         Check if channel is accessible to the current user.
@@ -88,10 +123,10 @@ class ChannelService:
             True if channel is accessible, False otherwise
         """
         try:
-            await self.client.get_chat(channel_id)
+            await telegram_manager.call("get_chat", lambda: self.client.get_chat(channel_id))
             return True
         except (ChannelPrivate, UsernameNotOccupied, UsernameInvalid):
             return False
         except Exception as e:
-            logger.error(f"Error checking channel accessibility: {e}")
+            logger.error("Error checking channel accessibility: %s", e)
             return False
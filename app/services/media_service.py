@@ -1,20 +1,139 @@
 """Service for media file handling and caching."""
 
+import asyncio
 import logging
+import mmap
 import os
+import shutil
+import sqlite3
+import threading
+from collections import OrderedDict
+from functools import lru_cache
 from pathlib import Path
-from typing import Optional
-import base64
+from typing import Dict, Optional, Set, Tuple
+
+try:
+    import pybase64 as base64
+except ImportError:
+    import base64
 
 from pyrogram import Client
 from pyrogram.types import Message
-import aiofiles
 
 from config import settings
+from app.core.telegram_client import telegram_manager
 from app.core.exceptions import MediaDownloadError
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of resolved media paths kept in memory
+PATH_CACHE_MAX_SIZE = 4096
+
+# SQLite file (inside sessions_dir, which is not served) mapping file_unique_id to a cached path
+FILE_INDEX_NAME = "media_index.sqlite3"
+
+
+def _count_files(path: str) -> int:
+    """Count regular files under a directory using os.scandir."""
+    count = 0
+    stack = [path]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    count += 1
+    return count
+
+
+def _encode_file_base64(path: Path) -> str:
+    """Base64 encode a file through mmap (blocking; run in a thread)."""
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return ""
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            return base64.b64encode(mm).decode('ascii')
+
+
+@lru_cache(maxsize=PATH_CACHE_MAX_SIZE)
+def _ensure_dir(path_str: str) -> None:
+    """Create a directory once per process; repeat calls are a dict lookup."""
+    Path(path_str).mkdir(parents=True, exist_ok=True)
+
+
+class FileIdIndex:
+    """
+    Persistent index of Telegram file_unique_id to an already-downloaded file.
+    Lets identical media (forwards, reposts) resolve without another download.
+
+    Reads and writes run in a worker thread; the connection is shared under a lock.
+    """
+
+    def __init__(self, db_path: Path):
+        self.db_path = db_path
+        db_path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = sqlite3.connect(str(db_path), check_same_thread=False)
+        # WAL with synchronous=NORMAL commits without an fsync per write
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_index "
+            "(file_unique_id TEXT PRIMARY KEY, path TEXT NOT NULL)"
+        )
+        self._conn.commit()
+
+    def _write(self, sql: str, params: tuple = ()) -> None:
+        """Execute and commit a write (blocking; run in a thread)."""
+        with self._lock:
+            if self._conn is None:
+                return
+            self._conn.execute(sql, params)
+            self._conn.commit()
+
+    def _read(self, file_unique_id: str) -> Optional[Path]:
+        """Look up the stored path (blocking; run in a thread)."""
+        with self._lock:
+            if self._conn is None:
+                return None
+            row = self._conn.execute(
+                "SELECT path FROM file_index WHERE file_unique_id = ?",
+                (file_unique_id,)
+            ).fetchone()
+        return Path(row[0]) if row else None
+
+    async def get(self, file_unique_id: str) -> Optional[Path]:
+        """Get the stored path for a file_unique_id, if any."""
+        return await asyncio.to_thread(self._read, file_unique_id)
+
+    async def set(self, file_unique_id: str, path: Path) -> None:
+        """Store the path of a downloaded file."""
+        await asyncio.to_thread(
+            self._write,
+            "INSERT OR REPLACE INTO file_index (file_unique_id, path) VALUES (?, ?)",
+            (file_unique_id, str(path))
+        )
+
+    async def delete(self, file_unique_id: str) -> None:
+        """Drop an entry whose file no longer exists."""
+        await asyncio.to_thread(
+            self._write,
+            "DELETE FROM file_index WHERE file_unique_id = ?",
+            (file_unique_id,)
+        )
+
+    def clear(self) -> None:
+        """Drop all entries."""
+        self._write("DELETE FROM file_index")
+
+    def close(self) -> None:
+        """Close the connection; later calls are no-ops."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
 
 class MediaService:
     """Service for downloading and caching media files."""
@@ -27,8 +146,69 @@ class MediaService:
             client: Pyrogram client instance
         """
         self.client = client
-        self.cache_dir = Path(settings.media_cache_dir)
+        # Absolute, so cache paths match the absolute paths Pyrogram returns
+        self.cache_dir = settings.media_cache_path
         self.cache_dir.mkdir(parents=True, exist_ok=True)
+        self._path_cache: OrderedDict[Tuple[int, int, str], Path] = OrderedDict()
+        self._inflight: Dict[Tuple[int, int, str], asyncio.Task] = {}
+        self._dir_cache: OrderedDict[str, Set[str]] = OrderedDict()
+        self._file_index = FileIdIndex(settings.sessions_path / FILE_INDEX_NAME)
+
+    def close(self) -> None:
+        """Release resources held by the service (the file index connection)."""
+        self._file_index.close()
+
+    def _remember_path(self, channel_id: int, message_id: int, file_name: str, path: Path) -> None:
+        """
+        Store a resolved media path in the LRU path cache.
+
+        Args:
+            channel_id: Channel ID
+            message_id: Message ID
+            file_name: File name
+            path: Path to the cached file
+        """
+        key = (channel_id, message_id, file_name)
+        self._path_cache[key] = path
+        self._path_cache.move_to_end(key)
+        while len(self._path_cache) > PATH_CACHE_MAX_SIZE:
+            self._path_cache.popitem(last=False)
+
+        entries = self._dir_cache.get(str(path.parent))
+        if entries is not None:
+            entries.add(path.name)
+
+    def _dir_entries(self, directory: Path) -> Set[str]:
+        """
+        Get the file names in a cache directory, scanning it once and then
+        answering from memory (LRU bounded by PATH_CACHE_MAX_SIZE).
+
+        Args:
+            directory: Cache directory
+
+        Returns:
+            Set of entry names (kept up to date by _remember_path)
+        """
+        key = str(directory)
+        entries = self._dir_cache.get(key)
+        if entries is not None:
+            self._dir_cache.move_to_end(key)
+            return entries
+
+        try:
+            with os.scandir(key) as it:
+                entries = {entry.name for entry in it}
+        except FileNotFoundError:
+            entries = set()
+
+        self._dir_cache[key] = entries
+        while len(self._dir_cache) > PATH_CACHE_MAX_SIZE:
+            self._dir_cache.popitem(last=False)
+        return entries
+
+    def _is_cached_file(self, path: Path) -> bool:
+        """Check if a cache file exists using the in-memory directory listing."""
+        return path.name in self._dir_entries(path.parent)
 
     def _get_media_cache_path(
         self,
@@ -47,12 +227,121 @@ class MediaService:
         Returns:
             Path object for the cached file
         """
-        # Create directory structure: media/{channel_id}/{message_id}/
-        message_dir = self.cache_dir / str(abs(channel_id)) / str(message_id)
-        message_dir.mkdir(parents=True, exist_ok=True)
+        # Create directory structure: media/{channel_id}/{shard}/{message_id}/
+        # where shard is message_id % 256 in hex, keeping directories small
+        channel_dir = self.cache_dir / str(abs(channel_id))
+        _ensure_dir(str(channel_dir))
+        shard_dir = channel_dir / f"{message_id % 256:02x}"
+        _ensure_dir(str(shard_dir))
+        message_dir = shard_dir / str(message_id)
+        _ensure_dir(str(message_dir))
 
         return message_dir / file_name
 
+    def _adopt_legacy_file(
+        self,
+        channel_id: int,
+        message_id: int,
+        file_name: str,
+        cache_path: Path
+    ) -> bool:
+        """
+        Move a file cached under the old unsharded layout
+        (media/{channel_id}/{message_id}/) to its sharded cache path.
+
+        Args:
+            channel_id: Channel ID
+            message_id: Message ID
+            file_name: File name
+            cache_path: Sharded destination path
+
+        Returns:
+            True if a legacy file was moved into place
+        """
+        legacy_path = self.cache_dir / str(abs(channel_id)) / str(message_id) / file_name
+        if not legacy_path.is_file():
+            return False
+
+        try:
+            os.replace(legacy_path, cache_path)
+        except OSError as e:
+            logger.debug("Could not migrate %s: %s", legacy_path, e)
+            return False
+
+        self._remember_path(channel_id, message_id, file_name, cache_path)
+        return True
+
+    @staticmethod
+    def _get_file_unique_id(message: Message) -> Optional[str]:
+        """
+        Get Telegram's stable file_unique_id for the message media.
+
+        Args:
+            message: Pyrogram Message object
+
+        Returns:
+            file_unique_id, or None for media without a file (polls, locations...)
+        """
+        media = getattr(message, message.media.value, None)
+        return getattr(media, "file_unique_id", None)
+
+    @staticmethod
+    def get_media_file_size(message: Message) -> Optional[int]:
+        """
+        Get the size Telegram reports for the message media, without downloading it.
+
+        Args:
+            message: Pyrogram Message object
+
+        Returns:
+            File size in bytes, or None if unknown
+        """
+        media = getattr(message, message.media.value, None)
+        return getattr(media, "file_size", None)
+
+    def is_too_large_for_base64(self, message: Message) -> bool:
+        """
+        Check if the message media exceeds settings.max_base64_bytes.
+
+        Args:
+            message: Pyrogram Message object with media
+
+        Returns:
+            True if the media should be served as a URL instead of base64
+        """
+        file_size = self.get_media_file_size(message)
+        return file_size is not None and file_size > settings.max_base64_bytes
+
+    async def _link_indexed_file(self, file_unique_id: str, cache_path: Path) -> bool:
+        """
+        Hardlink a previously downloaded copy of the same file into cache_path.
+
+        Args:
+            file_unique_id: Telegram file_unique_id
+            cache_path: Destination path
+
+        Returns:
+            True if cache_path now holds the file, False otherwise
+        """
+        existing = await self._file_index.get(file_unique_id)
+        if existing is None:
+            return False
+
+        try:
+            os.link(existing, cache_path)
+        except FileExistsError:
+            return True
+        except FileNotFoundError:
+            # Indexed file was removed from disk
+            await self._file_index.delete(file_unique_id)
+            return False
+        except OSError as e:
+            logger.debug("Could not link %s to %s: %s", existing, cache_path, e)
+            return False
+
+        logger.debug("Linked media %s to %s", file_unique_id, cache_path)
+        return True
+
     def _get_file_extension(self, message: Message) -> str:
         """
         Get appropriate file extension for media type.
@@ -117,28 +406,82 @@ class MediaService:
             )
 
             # Check if already cached
-            if cache_path.exists():
-                logger.debug(f"Media already cached: {cache_path}")
+            if self._is_cached_file(cache_path):
+                logger.debug("Media already cached: %s", cache_path)
+                self._remember_path(channel_id, message.id, file_name, cache_path)
                 return cache_path
 
-            # Download media
-            logger.info(f"Downloading media for message {message.id}")
-            downloaded_path = await self.client.download_media(
-                message,
-                file_name=str(cache_path)
-            )
+            if self._adopt_legacy_file(channel_id, message.id, file_name, cache_path):
+                return cache_path
 
-            if not downloaded_path:
-                raise MediaDownloadError(
-                    f"Failed to download media for message {message.id}"
+            # Reuse an identical file downloaded for another message
+            file_unique_id = self._get_file_unique_id(message)
+            if file_unique_id and await self._link_indexed_file(file_unique_id, cache_path):
+                self._remember_path(channel_id, message.id, file_name, cache_path)
+                return cache_path
+
+            # Join an in-flight download of the same file instead of starting another
+            key = (channel_id, message.id, file_name)
+            task = self._inflight.get(key)
+            if task is None:
+                task = asyncio.create_task(
+                    self._download(message, channel_id, file_name, cache_path)
                 )
+                self._inflight[key] = task
+                task.add_done_callback(lambda _: self._inflight.pop(key, None))
+            else:
+                logger.debug("Waiting for in-flight download of %s", cache_path)
 
-            logger.info(f"Media downloaded successfully: {downloaded_path}")
-            return Path(downloaded_path)
+            return await asyncio.shield(task)
 
         except Exception as e:
-            logger.error(f"Media download failed: {e}")
-            raise MediaDownloadError(f"Media download failed: {str(e)}")
+            logger.error("Media download failed: %s", e)
+            raise MediaDownloadError(f"Media download failed: {str(e)}") from e
+
+    async def _download(
+        self,
+        message: Message,
+        channel_id: int,
+        file_name: str,
+        cache_path: Path
+    ) -> Path:
+        """
+        Download media to the cache path and remember the result.
+
+        Args:
+            message: Pyrogram Message object with media
+            channel_id: Channel ID
+            file_name: File name
+            cache_path: Destination path
+
+        Returns:
+            Path to downloaded file
+
+        Raises:
+            MediaDownloadError: If Telegram returned no file
+        """
+        logger.info("Downloading media for message %s", message.id)
+        downloaded_path = await telegram_manager.call(
+            "download_media",
+            lambda: self.client.download_media(message, file_name=str(cache_path))
+        )
+
+        if not downloaded_path:
+            raise MediaDownloadError(
+                f"Failed to download media for message {message.id}"
+            )
+
+        logger.info("Media downloaded successfully: %s", downloaded_path)
+        downloaded_path = Path(downloaded_path)
+        # The directory changed on disk: rescan its listing on the next lookup
+        self._dir_cache.pop(str(downloaded_path.parent), None)
+        self._remember_path(channel_id, message.id, file_name, downloaded_path)
+
+        file_unique_id = self._get_file_unique_id(message)
+        if file_unique_id:
+            await self._file_index.set(file_unique_id, downloaded_path)
+
+        return downloaded_path
 
     async def get_media_url(
         self,
@@ -170,14 +513,14 @@ class MediaService:
             relative_path = cache_path.relative_to(self.cache_dir)
 
             # Construct URL
-            # Format: /media/{channel_id}/{message_id}/{filename}
+            # Format: /media/{channel_id}/{shard}/{message_id}/{filename}
             url_path = str(relative_path).replace('\\', '/')
             media_url = f"{base_url}/media/{url_path}"
 
             return media_url
 
         except Exception as e:
-            logger.error(f"Failed to get media URL: {e}")
+            logger.error("Failed to get media URL: %s", e)
             return None
 
     def get_lazy_media_url(
@@ -214,7 +557,7 @@ class MediaService:
             return media_url
 
         except Exception as e:
-            logger.error(f"Failed to generate lazy media URL: {e}")
+            logger.error("Failed to generate lazy media URL: %s", e)
             return None
 
     async def get_media_base64(
@@ -234,25 +577,27 @@ class MediaService:
 
         Warning:
             This can be memory-intensive for large files.
-            Recommended only for small images.
+            Media larger than settings.max_base64_bytes is not encoded.
         """
         if not message.media:
             return None
 
+        if self.is_too_large_for_base64(message):
+            logger.warning("Media of message %s is too large for base64", message.id)
+            return None
+
         try:
             cache_path = await self.download_media(message, channel_id)
 
-            if not cache_path or not cache_path.exists():
+            if not cache_path or not self._is_cached_file(cache_path):
                 return None
 
-            # Read file and encode to base64
-            async with aiofiles.open(cache_path, 'rb') as f:
-                file_data = await f.read()
-                base64_data = base64.b64encode(file_data).decode('utf-8')
-                return base64_data
+            # Encode straight from a memory map in a worker thread: one C call,
+            # no copy of the raw file on the Python heap
+            return await asyncio.to_thread(_encode_file_base64, cache_path)
 
         except Exception as e:
-            logger.error(f"Failed to encode media to base64: {e}")
+            logger.error("Failed to encode media to base64: %s", e)
             return None
 
     def get_cached_media_path(
@@ -274,11 +619,64 @@ class MediaService:
         """
         cache_path = self._get_media_cache_path(channel_id, message_id, file_name)
 
-        if cache_path.exists():
+        if self._is_cached_file(cache_path):
+            return cache_path
+
+        if self._adopt_legacy_file(channel_id, message_id, file_name, cache_path):
             return cache_path
 
         return None
 
+    async def find_cached_media(
+        self,
+        channel_id: int,
+        message_id: int,
+        file_name: str
+    ) -> Optional[Path]:
+        """
+        Get path to cached media file, consulting the in-memory LRU first.
+
+        Misses are answered from the cached directory listing, so each
+        message directory is scanned at most once.
+
+        Args:
+            channel_id: Channel ID
+            message_id: Message ID
+            file_name: File name
+
+        Returns:
+            Path if file is cached, None otherwise
+        """
+        key = (channel_id, message_id, file_name)
+        path = self._path_cache.get(key)
+        if path is not None:
+            self._path_cache.move_to_end(key)
+            return path
+
+        path = self.get_cached_media_path(channel_id, message_id, file_name)
+        if path is not None:
+            self._remember_path(channel_id, message_id, file_name, path)
+
+        return path
+
+    def forget_cached_media(
+        self,
+        channel_id: int,
+        message_id: int,
+        file_name: str
+    ) -> None:
+        """
+        Drop a media path from the in-memory LRU.
+
+        Args:
+            channel_id: Channel ID
+            message_id: Message ID
+            file_name: File name
+        """
+        path = self._path_cache.pop((channel_id, message_id, file_name), None)
+        if path is not None:
+            self._dir_cache.pop(str(path.parent), None)
+
     def clear_cache(self) -> int:
         """
         Clear all cached media files.
@@ -287,16 +685,25 @@ class MediaService:
             Number of files deleted
         """
         deleted_count = 0
+        self._path_cache.clear()
+        self._dir_cache.clear()
+        self._file_index.clear()
+        _ensure_dir.cache_clear()
 
         try:
-            for file_path in self.cache_dir.rglob('*'):
-                if file_path.is_file():
-                    file_path.unlink()
-                    deleted_count += 1
-
-            logger.info(f"Cleared {deleted_count} cached media files")
+            # Remove whole channel trees at once
+            with os.scandir(self.cache_dir) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        deleted_count += _count_files(entry.path)
+                        shutil.rmtree(entry.path, ignore_errors=True)
+                    else:
+                        os.unlink(entry.path)
+                        deleted_count += 1
+
+            logger.info("Cleared %s cached media files", deleted_count)
             return deleted_count
 
         except Exception as e:
-            logger.error(f"Failed to clear cache: {e}")
+            logger.error("Failed to clear cache: %s", e)
             return deleted_count
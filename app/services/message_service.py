@@ -1,18 +1,41 @@
 """Service for message-related operations."""
 
+import asyncio
+import inspect
 import logging
-from datetime import datetime
-from typing import List, Optional, Tuple
+import math
+import random
+import time
+from collections import OrderedDict
+from datetime import datetime, timedelta
+from typing import AsyncIterator, Dict, List, Optional, Tuple
 from pyrogram import Client
-from pyrogram.types import Message
-from pyrogram.errors import ChannelPrivate
+from pyrogram.types import Chat, Message
+from pyrogram.errors import ChannelPrivate, UsernameNotOccupied
 
+from config import settings
+from app.core.telegram_client import telegram_manager
 from app.core.exceptions import ChannelNotFoundError, MessageNotFoundError
 from app.models.responses import MessageResponse
 from app.utils.formatters import format_message
 
 logger = logging.getLogger(__name__)
 
+# Maximum number of resolved chats kept in memory
+CHAT_CACHE_MAX_SIZE = 1024
+
+# Maximum number of messages kept by get_message_by_id
+MESSAGE_CACHE_MAX_SIZE = 4096
+
+# Scales how early (relative to fetch time) cached chats may be refreshed
+CHAT_CACHE_EARLY_REFRESH = 1.0
+
+# Pages with more messages than this are formatted in a worker thread
+FORMAT_IN_THREAD_THRESHOLD = 32
+
+# Maximum number of media URL generators awaited at once in format_messages
+MEDIA_URL_CONCURRENCY = 20
+
 
 class MessageService:
     """Service for fetching and processing Telegram messages."""
@@ -25,78 +48,195 @@ class MessageService:
             client: Pyrogram client instance
         """
         self.client = client
+        self._chat_cache: OrderedDict[int | str, Tuple[float, float, Chat]] = OrderedDict()
+        self._message_cache: OrderedDict[Tuple[int | str, int], Tuple[float, Message]] = OrderedDict()
+        self._chat_inflight: Dict[int | str, asyncio.Task] = {}
 
-    async def fetch_messages(
+    async def resolve_chat(self, channel_id: int | str) -> Chat:
+        """
+        Resolve a channel ID or username to a Chat, cached for chat_cache_ttl seconds.
+
+        The cache is an LRU bounded by CHAT_CACHE_MAX_SIZE. Entries are refreshed
+        probabilistically shortly before they expire, so concurrent requests don't
+        all miss at the same moment; requests that do miss together share one fetch.
+
+        Args:
+            channel_id: Channel ID or username
+
+        Returns:
+            Pyrogram Chat object
+
+        Raises:
+            ChannelNotFoundError: If channel not accessible
+        """
+        cached = self._chat_cache.get(channel_id)
+        if cached:
+            expires_at, fetch_time, chat = cached
+            # Probabilistic early expiration: refresh sooner the longer a fetch takes
+            if time.monotonic() - fetch_time * CHAT_CACHE_EARLY_REFRESH * math.log(1.0 - random.random()) < expires_at:
+                self._chat_cache.move_to_end(channel_id)
+                return chat
+
+        # Concurrent misses for the same chat share a single get_chat call
+        task = self._chat_inflight.get(channel_id)
+        if task is None:
+            task = asyncio.create_task(self._fetch_chat(channel_id))
+            self._chat_inflight[channel_id] = task
+            task.add_done_callback(lambda _: self._chat_inflight.pop(channel_id, None))
+
+        return await asyncio.shield(task)
+
+    async def _fetch_chat(self, channel_id: int | str) -> Chat:
+        """
+        Fetch a chat from Telegram and store it in the chat cache.
+
+        Args:
+            channel_id: Channel ID or username
+
+        Returns:
+            Pyrogram Chat object
+
+        Raises:
+            ChannelNotFoundError: If channel not accessible
+        """
+        started = time.monotonic()
+        try:
+            chat = await telegram_manager.call("get_chat", lambda: self.client.get_chat(channel_id))
+        except (ChannelPrivate, UsernameNotOccupied):
+            logger.error("Channel %s is private or not accessible", channel_id)
+            raise ChannelNotFoundError(channel_id)
+
+        now = time.monotonic()
+        entry = (now + settings.chat_cache_ttl, now - started, chat)
+        # Also key by numeric ID so later lookups by ID skip username resolution
+        for key in {channel_id, chat.id}:
+            self._chat_cache[key] = entry
+            self._chat_cache.move_to_end(key)
+        while len(self._chat_cache) > CHAT_CACHE_MAX_SIZE:
+            self._chat_cache.popitem(last=False)
+        return chat
+
+    async def iter_messages(
         self,
         channel_id: int | str,
         limit: int = 20,
         offset_id: int = 0,
         date_from: Optional[datetime] = None,
         date_to: Optional[datetime] = None
-    ) -> Tuple[List[Message], Optional[int], bool]:
+    ) -> AsyncIterator[Message]:
         """
-        Fetch messages from a channel with pagination and date filtering.
+        Yield messages from a channel as they arrive, applying the date filter.
 
         Args:
             channel_id: Channel ID or username
-            limit: Number of messages to fetch
+            limit: Maximum number of messages to yield
             offset_id: Message ID to use as offset for pagination
             date_from: Filter messages from this date
             date_to: Filter messages until this date
 
-        Returns:
-            Tuple of (messages list, next_offset_id, has_more)
+        Yields:
+            Pyrogram Message objects, newest first
 
         Raises:
             ChannelNotFoundError: If channel not accessible
         """
+        history_kwargs = {}
+        if date_to is not None and offset_id <= 0:
+            # Let Telegram skip messages newer than date_to; offset_date is
+            # exclusive, so add a second to keep messages sent exactly at date_to.
+            # Later pages continue from offset_id, which is already older.
+            history_kwargs["offset_date"] = date_to + timedelta(seconds=1)
+
+        # The generator pages lazily, so only its first request can be limited here
+        await telegram_manager.acquire("get_chat_history")
+        history = self.client.get_chat_history(
+            channel_id,
+            limit=limit,
+            offset_id=offset_id if offset_id > 0 else 0,
+            **history_kwargs
+        )
+
         try:
-            messages = []
-            fetched_count = 0
-
-            # Iterate through chat history
-            async for message in self.client.get_chat_history(
-                channel_id,
-                limit=limit,
-                offset_id=offset_id if offset_id > 0 else 0
-            ):
-                fetched_count += 1
-
-                # Apply date filtering
-                if date_from and message.date < date_from:
+            if date_from is None and date_to is None:
+                # No date filter: pass everything through (at most `limit` messages)
+                async for message in history:
+                    yield message
+                return
+
+            # Compare POSIX timestamps: Pyrogram's message.date is naive local time
+            # while query bounds are usually timezone-aware, and a float compare
+            # is cheaper than datetime comparison anyway
+            from_ts = date_from.timestamp() if date_from is not None else None
+            to_ts = date_to.timestamp() if date_to is not None else None
+
+            yielded = 0
+            async for message in history:
+                message_ts = message.date.timestamp()
+
+                if from_ts is not None and message_ts < from_ts:
                     # Messages are in descending order, so we can break early
                     break
 
-                if date_to and message.date > date_to:
-                    # Skip messages that are too new
-                    continue
+                # Skip messages that are too new
+                if to_ts is None or message_ts <= to_ts:
+                    yield message
+                    yielded += 1
+                    if yielded >= limit:
+                        break
 
-                # Both conditions met, add to results
-                if (not date_from or message.date >= date_from) and \
-                   (not date_to or message.date <= date_to):
-                    messages.append(message)
+        except ChannelPrivate:
+            logger.error("Channel %s is private or not accessible", channel_id)
+            raise ChannelNotFoundError(channel_id)
 
-                # Stop if we've collected enough messages
-                if len(messages) >= limit:
-                    break
+    async def fetch_messages(
+        self,
+        channel_id: int | str,
+        limit: int = 20,
+        offset_id: int = 0,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None
+    ) -> Tuple[List[Message], Optional[int], bool]:
+        """
+        Fetch messages from a channel with pagination and date filtering.
+
+        Args:
+            channel_id: Channel ID or username
+            limit: Number of messages to fetch
+            offset_id: Message ID to use as offset for pagination
+            date_from: Filter messages from this date
+            date_to: Filter messages until this date
 
-            # Calculate next offset and has_more flag
+        Returns:
+            Tuple of (messages list, next_offset_id, has_more)
+
+        Raises:
+            ChannelNotFoundError: If channel not accessible
+        """
+        try:
+            messages = [
+                message async for message in self.iter_messages(
+                    channel_id, limit, offset_id, date_from, date_to
+                )
+            ]
+
+            # Calculate next offset and has_more flag. A full page means there may
+            # be more; the date_to bound is applied by Telegram and date_from stops
+            # the scan, so a short page means the range is exhausted.
             next_offset_id = messages[-1].id if messages else None
-            has_more = fetched_count >= limit
+            has_more = len(messages) >= limit
 
             logger.info(
-                f"Fetched {len(messages)} messages from channel {channel_id} "
-                f"(offset_id={offset_id}, limit={limit})"
+                "Fetched %d messages from channel %s (offset_id=%d, limit=%d)",
+                len(messages), channel_id, offset_id, limit
             )
 
             return messages, next_offset_id, has_more
 
-        except ChannelPrivate:
-            logger.error(f"Channel {channel_id} is private or not accessible")
-            raise ChannelNotFoundError(channel_id)
+        except ChannelNotFoundError:
+            raise
 
         except Exception as e:
-            logger.error(f"Failed to fetch messages from {channel_id}: {e}")
+            logger.error("Failed to fetch messages from %s: %s", channel_id, e)
             raise
 
     async def get_message_by_id(
@@ -105,7 +245,7 @@ class MessageService:
         message_id: int
     ) -> Message:
         """
-        Get a specific message by its ID.
+        Get a specific message by its ID, cached for message_cache_ttl seconds.
 
         Args:
             channel_id: Channel ID or username
@@ -118,25 +258,38 @@ class MessageService:
             MessageNotFoundError: If message not found
             ChannelNotFoundError: If channel not accessible
         """
+        key = (channel_id, message_id)
+        cached = self._message_cache.get(key)
+        if cached and time.monotonic() < cached[0]:
+            self._message_cache.move_to_end(key)
+            return cached[1]
+
         try:
-            messages = await self.client.get_messages(
-                channel_id,
-                message_ids=message_id
+            messages = await telegram_manager.call(
+                "get_messages",
+                lambda: self.client.get_messages(channel_id, message_ids=message_id)
             )
 
             if not messages or messages.empty:
                 raise MessageNotFoundError(message_id)
 
-            logger.info(f"Retrieved message {message_id} from channel {channel_id}")
+            logger.info("Retrieved message %s from channel %s", message_id, channel_id)
+
+            # Cache without locking: the event loop never interleaves these steps
+            self._message_cache[key] = (time.monotonic() + settings.message_cache_ttl, messages)
+            self._message_cache.move_to_end(key)
+            while len(self._message_cache) > MESSAGE_CACHE_MAX_SIZE:
+                self._message_cache.popitem(last=False)
             return messages
 
         except ChannelPrivate:
-            logger.error(f"Channel {channel_id} is private or not accessible")
+            logger.error("Channel %s is private or not accessible", channel_id)
             raise ChannelNotFoundError(channel_id)
 
         except Exception as e:
             logger.error(
-                f"Failed to get message {message_id} from {channel_id}: {e}"
+                "Failed to get message %s from %s: %s",
+                message_id, channel_id, e
             )
             raise
 
@@ -152,30 +305,71 @@ class MessageService:
         Args:
             messages: List of Pyrogram Message objects
             include_media: Whether to include media information
-            media_url_generator: Optional callable to generate media URLs
+            media_url_generator: Optional callable (sync or async) to generate media URLs
 
         Returns:
             List of formatted MessageResponse objects
         """
-        formatted_messages = []
-
-        for message in messages:
-            # Generate media URL if needed
-            media_url = None
-            if include_media and media_url_generator and message.media:
-                try:
-                    media_url = await media_url_generator(message)
-                except Exception as e:
-                    logger.warning(f"Failed to generate media URL for message {message.id}: {e}")
+        media_urls = {}
+
+        if include_media and media_url_generator:
+            media_messages = [message for message in messages if message.media]
+
+            if inspect.iscoroutinefunction(media_url_generator):
+                # Run async generators concurrently, bounded by a semaphore
+                semaphore = asyncio.Semaphore(MEDIA_URL_CONCURRENCY)
+
+                async def generate(message: Message):
+                    async with semaphore:
+                        return await media_url_generator(message)
+
+                results = await asyncio.gather(
+                    *(generate(message) for message in media_messages),
+                    return_exceptions=True
+                )
+                for message, result in zip(media_messages, results):
+                    if isinstance(result, Exception):
+                        logger.warning("Failed to generate media URL for message %s: %s", message.id, result)
+                    else:
+                        media_urls[message.id] = result
+            else:
+                # Sync generators (lazy URLs) are cheap, call them inline
+                for message in media_messages:
+                    try:
+                        media_urls[message.id] = media_url_generator(message)
+                    except Exception as e:
+                        logger.warning("Failed to generate media URL for message %s: %s", message.id, e)
+
+        if len(messages) > FORMAT_IN_THREAD_THRESHOLD:
+            # Keep the event loop free while large pages are formatted
+            return await asyncio.to_thread(self._format_sync, messages, media_urls, include_media)
+        return self._format_sync(messages, media_urls, include_media)
+
+    @staticmethod
+    def _format_sync(
+        messages: List[Message],
+        media_urls: dict,
+        include_media: bool
+    ) -> List[MessageResponse]:
+        """
+        Format messages with already resolved media URLs (CPU only, no I/O).
 
-            formatted_message = format_message(message, media_url)
-            formatted_messages.append(formatted_message)
+        Args:
+            messages: List of Pyrogram Message objects
+            media_urls: Media URL (or base64 data) by message ID
+            include_media: Whether to include media information
 
-        return formatted_messages
+        Returns:
+            List of formatted MessageResponse objects
+        """
+        return [
+            format_message(message, media_urls.get(message.id), include_media)
+            for message in messages
+        ]
 
     async def get_channel_title(self, channel_id: int | str) -> str:
         """
-        Get the title of a channel.
+        Get the title of a channel (served from the resolve_chat cache).
 
         Args:
             channel_id: Channel ID or username
@@ -187,12 +381,12 @@ class MessageService:
             ChannelNotFoundError: If channel not accessible
         """
         try:
-            chat = await self.client.get_chat(channel_id)
+            chat = await self.resolve_chat(channel_id)
             return chat.title or str(channel_id)
 
-        except ChannelPrivate:
-            raise ChannelNotFoundError(channel_id)
+        except ChannelNotFoundError:
+            raise
 
         except Exception as e:
-            logger.error(f"Failed to get channel title for {channel_id}: {e}")
+            logger.error("Failed to get channel title for %s: %s", channel_id, e)
             return str(channel_id)
@@ -0,0 +1,33 @@
+"""Helpers for ETag based conditional responses."""
+
+import hashlib
+
+from fastapi import Request, Response, status
+
+
+def make_etag(data: bytes | str) -> str:
+    """Build a strong ETag value from response content."""
+    if isinstance(data, str):
+        data = data.encode('utf-8')
+    return f'"{hashlib.sha1(data).hexdigest()}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Check if the request's If-None-Match header matches the given ETag."""
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+
+    if if_none_match.strip() == "*":
+        return True
+
+    candidates = {value.strip().removeprefix("W/") for value in if_none_match.split(",")}
+    return etag in candidates
+
+
+def not_modified(etag: str, headers: dict[str, str] | None = None) -> Response:
+    """Build an empty 304 response carrying the ETag and cache headers."""
+    return Response(
+        status_code=status.HTTP_304_NOT_MODIFIED,
+        headers={**(headers or {}), "ETag": etag}
+    )
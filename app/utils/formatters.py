@@ -1,4 +1,8 @@
-"""Utilities for formatting data from Pyrogram to API response models."""
+"""Utilities for formatting data from Pyrogram to API response models.
+
+Models are built with model_construct: the inputs are typed Pyrogram attributes,
+so validation is skipped. Every required field must be passed explicitly.
+"""
 
 from typing import Optional, List
 from pyrogram.types import Message, Chat, User
@@ -12,13 +16,26 @@ from app.models.responses import (
     ChannelInfo
 )
 
+# MediaInfo fields copied from each media type's Pyrogram object,
+# in the order media attributes are probed
+MEDIA_INFO_FIELDS = {
+    "photo": ("file_size", "width", "height"),
+    "video": ("file_size", "mime_type", "duration", "width", "height", "file_name"),
+    "audio": ("file_size", "mime_type", "duration", "file_name"),
+    "voice": ("file_size", "mime_type", "duration"),
+    "document": ("file_size", "mime_type", "file_name"),
+    "sticker": (),
+    "animation": ("file_size", "mime_type", "width", "height", "file_name"),
+    "video_note": ("file_size", "duration"),
+}
+
 
 def format_author(user: Optional[User]) -> Optional[AuthorInfo]:
     """Format Pyrogram User to AuthorInfo model."""
     if not user:
         return None
 
-    return AuthorInfo(
+    return AuthorInfo.model_construct(
         id=user.id,
         username=user.username,
         first_name=user.first_name,
@@ -33,96 +50,40 @@ def format_reactions(message: Message) -> Optional[List[ReactionInfo]]:
 
     reactions = []
     for reaction in message.reactions.reactions:
-        if hasattr(reaction, 'emoji') and hasattr(reaction, 'count'):
-            reactions.append(ReactionInfo(
-                emoji=reaction.emoji,
-                count=reaction.count
-            ))
+        emoji = getattr(reaction, 'emoji', None)
+        count = getattr(reaction, 'count', None)
+        if emoji is not None and count is not None:
+            reactions.append(ReactionInfo.model_construct(emoji=emoji, count=count))
 
     return reactions if reactions else None
 
 
 def get_media_type(message: Message) -> Optional[str]:
     """Determine media type from message."""
-    if message.photo:
-        return "photo"
-    elif message.video:
-        return "video"
-    elif message.audio:
-        return "audio"
-    elif message.voice:
-        return "voice"
-    elif message.document:
-        return "document"
-    elif message.sticker:
-        return "sticker"
-    elif message.animation:
-        return "animation"
-    elif message.video_note:
-        return "video_note"
+    for media_type in MEDIA_INFO_FIELDS:
+        if getattr(message, media_type):
+            return media_type
     return None
 
 
 def format_media(message: Message, media_url: Optional[str] = None) -> Optional[MediaInfo]:
-    """Format media information from a message."""
-    media_type = get_media_type(message)
+    """Format media information from a message, probing each media attribute once."""
+    for media_type, field_names in MEDIA_INFO_FIELDS.items():
+        if media := getattr(message, media_type):
+            # Copy the fields this media type carries straight from the Pyrogram object
+            fields = {name: getattr(media, name, None) for name in field_names}
+            return MediaInfo.model_construct(type=media_type, url=media_url, **fields)
+
+    return None
 
-    if not media_type:
-        return None
 
-    media_info = MediaInfo(type=media_type, url=media_url)
-
-    # Photo
-    if message.photo:
-        media_info.file_size = message.photo.file_size
-        media_info.width = message.photo.width
-        media_info.height = message.photo.height
-        if message.photo.thumbs:
-            # Thumbnail URL will be handled separately if needed
-            pass
-
-    # Video
-    elif message.video:
-        media_info.file_size = message.video.file_size
-        media_info.mime_type = message.video.mime_type
-        media_info.duration = message.video.duration
-        media_info.width = message.video.width
-        media_info.height = message.video.height
-        media_info.file_name = message.video.file_name
-
-    # Audio
-    elif message.audio:
-        media_info.file_size = message.audio.file_size
-        media_info.mime_type = message.audio.mime_type
-        media_info.duration = message.audio.duration
-        media_info.file_name = message.audio.file_name
-
-    # Voice
-    elif message.voice:
-        media_info.file_size = message.voice.file_size
-        media_info.mime_type = message.voice.mime_type
-        media_info.duration = message.voice.duration
-
-    # Document
-    elif message.document:
-        media_info.file_size = message.document.file_size
-        media_info.mime_type = message.document.mime_type
-        media_info.file_name = message.document.file_name
-
-    # Animation (GIF)
-    elif message.animation:
-        media_info.file_size = message.animation.file_size
-        media_info.mime_type = message.animation.mime_type
-        media_info.width = message.animation.width
-        media_info.height = message.animation.height
-        media_info.file_name = message.animation.file_name
-
-    return media_info
-
-
-def format_message(message: Message, media_url: Optional[str] = None) -> MessageResponse:
+def format_message(
+    message: Message,
+    media_url: Optional[str] = None,
+    include_media: bool = True
+) -> MessageResponse:
     """Format Pyrogram Message to MessageResponse model."""
-    return MessageResponse(
+    return MessageResponse.model_construct(
         id=message.id,
         text=message.text or message.caption,
         date=message.date,
@@ -130,7 +91,7 @@ def format_message(message: Message, media_url: Optional[str] = None) -> Message
         forwards=message.forwards,
         reactions=format_reactions(message),
         author=format_author(message.from_user) if message.from_user else None,
-        media=format_media(message, media_url),
+        media=format_media(message, media_url) if include_media else None,
         reply_to_message_id=message.reply_to_message_id,
         edit_date=message.edit_date,
         has_protected_content=message.has_protected_content or False
@@ -139,7 +100,7 @@ def format_message(message: Message, media_url: Optional[str] = None) -> Message
 
 def format_channel(chat: Chat) -> ChannelInfo:
     """Format Pyrogram Chat to ChannelInfo model."""
-    return ChannelInfo(
+    return ChannelInfo.model_construct(
         id=chat.id,
         username=chat.username,
         title=chat.title,
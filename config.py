@@ -1,6 +1,8 @@
-from pydantic_settings import BaseSettings, SettingsConfigDict
+from functools import cached_property
 from pathlib import Path
 
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
 
 class Settings(BaseSettings):
     """Application configuration settings loaded from environment variables."""
@@ -17,22 +19,41 @@ class Settings(BaseSettings):
     app_port: int = 8000
     app_debug: bool = False
 
+    # Telegram Client Settings
+    telegram_workers: int = 64
+    telegram_max_concurrent_transmissions: int = 4
+    telegram_max_concurrent_requests: int = 64
+
     # Session Settings
     session_name: str = "telegram_session"
     sessions_dir: str = "sessions"
 
+    # Auth Settings
+    auth_cache_ttl: float = 30.0
+
+    # Response Cache Settings
+    response_cache_ttl: float = 30.0
+
     # Media Settings
     media_cache_dir: str = "media"
     media_cache_max_size_mb: int = 1000
     media_cache_ttl_hours: int = 24
+    # Larger media is returned as a URL even when base64 is requested
+    max_base64_bytes: int = 2 * 1024 * 1024
+    # Internal nginx location serving media_cache_dir (e.g. "/internal-media");
+    # when set, media downloads are answered with X-Accel-Redirect
+    media_accel_redirect_prefix: str | None = None
 
     # API Settings
     api_prefix: str = "/api/v1"
     max_messages_per_request: int = 100
     default_messages_limit: int = 20
+    chat_cache_ttl: float = 300.0
+    message_cache_ttl: float = 300.0
 
     # Security
-    cors_origins: list[str] = ["neptun.speedwagon.uz", "localhost:4200"]
+    # Browser Origin headers include the scheme, so entries must too
+    cors_origins: list[str] = ["https://neptun.speedwagon.uz", "http://localhost:4200"]
 
     model_config = SettingsConfigDict(
         env_file=".env",
@@ -41,12 +62,12 @@ class Settings(BaseSettings):
         extra="ignore"
     )
 
-    @property
+    @cached_property
     def sessions_path(self) -> Path:
         """Get absolute path to sessions directory."""
         return Path(self.sessions_dir).resolve()
 
-    @property
+    @cached_property
     def media_cache_path(self) -> Path:
         """Get absolute path to media cache directory."""
         return Path(self.media_cache_dir).resolve()
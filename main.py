@@ -1,14 +1,33 @@
 """Main FastAPI application entry point."""
 
+import asyncio
 import logging
 from contextlib import asynccontextmanager
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Request, status
+from pyrogram import Client
+from fastapi.responses import ORJSONResponse
 from fastapi.staticfiles import StaticFiles
 from fastapi.middleware.cors import CORSMiddleware
 
 from config import settings
 from app.core.telegram_client import telegram_manager
+from app.core.exceptions import (
+    TelegramBaseException,
+    TelegramNotAuthenticatedError,
+    TelegramConnectionError,
+    ChannelNotFoundError,
+    MessageNotFoundError,
+    TwoFactorAuthRequiredError,
+    InvalidPhoneCodeError,
+    InvalidPasswordError,
+    AuthInProgressError,
+    MediaDownloadError
+)
+from app.models.responses import TwoFactorRequiredResponse
+from app.services.channel_service import ChannelService
+from app.services.message_service import MessageService
+from app.services.media_service import MediaService
 
 # Configure logging
 logging.basicConfig(
@@ -23,17 +42,41 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     """
     Lifespan context manager for startup and shutdown events.
-    Manages Telegram client lifecycle.
+    Manages Telegram client lifecycle and shared service instances.
     """
+    def bind_services(client: Client) -> None:
+        """Create services for the current client and store them on app.state."""
+        previous = getattr(app.state, "media_service", None)
+        if previous is not None:
+            previous.close()
+        app.state.channel_service = ChannelService(client)
+        app.state.message_service = MessageService(client)
+        app.state.media_service = MediaService(client)
+
     # Startup
     logger.info("Starting Telegram Channel Message Receiver API")
+    telegram_manager.on_reconnect(bind_services)
+    app.state.target_chat = None
+
+    # Cap concurrent Telegram calls from request handlers
+    app.state.telegram_semaphore = asyncio.Semaphore(settings.telegram_max_concurrent_requests)
+
     try:
         await telegram_manager.start()
         logger.info("Telegram client started successfully")
     except Exception as e:
-        logger.error(f"Failed to start Telegram client: {e}")
+        logger.error("Failed to start Telegram client: %s", e)
         logger.warning("Application starting without Telegram connection")
 
+    # Resolve the configured channel once so requests don't need get_chat
+    try:
+        if await telegram_manager.is_authorized_cached():
+            chat = await app.state.message_service.resolve_chat(settings.target_channel_id)
+            app.state.target_chat = {"id": chat.id, "title": chat.title or str(chat.id)}
+            logger.info("Configured channel resolved: %s", chat.id)
+    except Exception as e:
+        logger.warning("Failed to resolve configured channel at startup: %s", e)
+
     yield
 
     # Shutdown
@@ -42,7 +85,11 @@ async def lifespan(app: FastAPI):
         await telegram_manager.stop()
         logger.info("Telegram client stopped successfully")
     except Exception as e:
-        logger.error(f"Error during Telegram client shutdown: {e}")
+        logger.error("Error during Telegram client shutdown: %s", e)
+
+    media_service = getattr(app.state, "media_service", None)
+    if media_service is not None:
+        media_service.close()
 
 
 # Create FastAPI application
@@ -51,6 +98,7 @@ app = FastAPI(
     description="REST API for receiving messages from Telegram channels via MTProto",
     version="1.0.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     debug=settings.app_debug
 )
 
@@ -59,10 +107,67 @@ app.add_middleware(
     CORSMiddleware,
     allow_origins=settings.cors_origins,
     allow_credentials=True,
-    allow_methods=["GET"],
-    allow_headers=["*"],
+    allow_methods=["GET", "POST"],
+    # Explicit lists let CORSMiddleware answer preflights without echoing headers
+    allow_headers=["Accept", "Accept-Language", "Content-Language", "Content-Type", "If-None-Match"],
+    expose_headers=["ETag"],
 )
 
+# HTTP status and client-facing detail for application exceptions; a None detail
+# uses the exception's own message. Anything not listed is a generic 500.
+EXCEPTION_RESPONSES = {
+    TelegramNotAuthenticatedError: (status.HTTP_401_UNAUTHORIZED, "Not authenticated with Telegram"),
+    TelegramConnectionError: (
+        status.HTTP_503_SERVICE_UNAVAILABLE,
+        "Telegram client not connected. Please try again later."
+    ),
+    ChannelNotFoundError: (status.HTTP_404_NOT_FOUND, None),
+    MessageNotFoundError: (status.HTTP_404_NOT_FOUND, None),
+    InvalidPhoneCodeError: (
+        status.HTTP_400_BAD_REQUEST,
+        "Invalid verification code. Please check and try again."
+    ),
+    InvalidPasswordError: (status.HTTP_400_BAD_REQUEST, "Invalid two-factor authentication password"),
+    AuthInProgressError: (status.HTTP_429_TOO_MANY_REQUESTS, None),
+    MediaDownloadError: (status.HTTP_500_INTERNAL_SERVER_ERROR, "Failed to download media file"),
+}
+
+# Detail returned for unexpected errors; the cause is only logged
+INTERNAL_ERROR_DETAIL = "Internal server error"
+
+
+@app.exception_handler(TwoFactorAuthRequiredError)
+async def two_factor_required_handler(request: Request, exc: TwoFactorAuthRequiredError):
+    """Tell the client to continue with /verify-2fa."""
+    logger.info("Two-factor authentication required")
+    return ORJSONResponse(content=TwoFactorRequiredResponse().model_dump())
+
+
+@app.exception_handler(TelegramBaseException)
+async def telegram_exception_handler(request: Request, exc: TelegramBaseException):
+    """Convert application exceptions to JSON error responses."""
+    status_code, detail = EXCEPTION_RESPONSES.get(
+        type(exc),
+        (status.HTTP_500_INTERNAL_SERVER_ERROR, INTERNAL_ERROR_DETAIL)
+    )
+    if status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+        logger.error("%s %s failed: %s", request.method, request.url.path, exc.message)
+    return ORJSONResponse(
+        status_code=status_code,
+        content={"detail": detail if detail is not None else exc.message}
+    )
+
+
+@app.exception_handler(Exception)
+async def unhandled_exception_handler(request: Request, exc: Exception):
+    """Convert unexpected errors to a 500 JSON response."""
+    logger.error("%s %s failed: %s", request.method, request.url.path, exc)
+    return ORJSONResponse(
+        status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+        content={"detail": INTERNAL_ERROR_DETAIL}
+    )
+
+
 # Mount static files for media serving
 try:
     app.mount(
@@ -70,9 +175,9 @@ try:
         StaticFiles(directory=settings.media_cache_dir),
         name="media"
     )
-    logger.info(f"Media directory mounted at /media from {settings.media_cache_dir}")
+    logger.info("Media directory mounted at /media from %s", settings.media_cache_dir)
 except Exception as e:
-    logger.warning(f"Failed to mount media directory: {e}")
+    logger.warning("Failed to mount media directory: %s", e)
 
 
 # Import and include routers (will be created next)
@@ -107,7 +212,7 @@ try:
     logger.info("API routes registered successfully")
 
 except ImportError as e:
-    logger.warning(f"Some routes not available yet: {e}")
+    logger.warning("Some routes not available yet: %s", e)
 
 
 @app.get("/health", tags=["System"])
@@ -118,7 +223,7 @@ async def health_check():
     Returns service status and Telegram connection state.
     """
     is_connected = telegram_manager.is_connected()
-    is_authorized = await telegram_manager.is_authorized() if is_connected else False
+    is_authorized = await telegram_manager.is_authorized_cached() if is_connected else False
 
     return {
         "status": "healthy",
@@ -140,12 +245,18 @@ async def root():
 
 
 if __name__ == "__main__":
+    import importlib.util
+
     import uvicorn
 
+    # uvloop and httptools come with uvicorn[standard]; fall back where they are
+    # unavailable (uvloop does not support Windows)
     uvicorn.run(
         "main:app",
         host=settings.app_host,
         port=settings.app_port,
         reload=settings.app_debug,
+        loop="uvloop" if importlib.util.find_spec("uvloop") else "asyncio",
+        http="httptools" if importlib.util.find_spec("httptools") else "h11",
         log_level="debug" if settings.app_debug else "info"
     )